@@ -1,11 +1,20 @@
 from django.urls import path
 
+from core.replicas import replica_reads
 from . import views
 
 
 app_name = 'about'
 
 urlpatterns = [
-    path('author/', views.AboutAuthorView.as_view(), name='author'),
-    path('tech/', views.AboutTechView.as_view(), name='tech'),
+    path(
+        'author/',
+        replica_reads(views.AboutAuthorView.as_view()),
+        name='author',
+    ),
+    path(
+        'tech/',
+        replica_reads(views.AboutTechView.as_view()),
+        name='tech',
+    ),
 ]
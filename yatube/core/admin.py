@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'task', 'status', 'attempts', 'run_at', 'locked_by',
+        'finished',
+    )
+    list_filter = ('status', 'task')
+    readonly_fields = (
+        'task', 'payload', 'attempts', 'locked_by', 'locked_at', 'error',
+        'created', 'finished',
+    )
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Job, JobAdmin)
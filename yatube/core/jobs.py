@@ -0,0 +1,214 @@
+"""
+Очередь фоновых задач в основной базе.
+
+Задача — функция модуля tasks.py приложения, помеченная @task. Метод
+delay() ставит её в очередь после коммита текущей транзакции, и запрос
+возвращается, не дожидаясь медленных побочных эффектов.
+
+Задачи выполняет manage.py run_worker. Воркер забирает строки Job
+через SELECT ... FOR UPDATE SKIP LOCKED там, где база это умеет, а на
+SQLite атомарным UPDATE, который сравнивает прежнее состояние строки.
+Упавшая задача возвращается в очередь с экспоненциальной задержкой,
+пока не кончатся попытки. Воркер продлевает блокировку своих задач,
+пока они выполняются, поэтому заново через JOBS_LOCK_TIMEOUT секунд
+забирается только задача воркера, который умер посреди работы. Итог
+задачи записывается, только пока она заблокирована тем же воркером.
+"""
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from . import processes
+from .models import Job
+
+TASKS = {}
+
+
+class Task:
+    """Функция, которую можно выполнить в фоне."""
+
+    def __init__(self, func, max_attempts=None):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        """Поставить задачу в очередь сразу."""
+        return Job.objects.create(
+            task=self.name,
+            payload=json.dumps({'args': args, 'kwargs': kwargs}),
+            max_attempts=self.max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        )
+
+    def delay(self, *args, **kwargs):
+        """Поставить задачу в очередь после коммита транзакции."""
+        transaction.on_commit(lambda: self.enqueue(*args, **kwargs))
+
+
+def task(func=None, *, max_attempts=None):
+    """Зарегистрировать функцию как задачу очереди."""
+    def register(func):
+        registered = Task(func, max_attempts)
+        TASKS[registered.name] = registered
+        return registered
+    return register(func) if func else register
+
+
+def backoff(attempts):
+    """Задержка перед повтором после attempts попыток, в секундах."""
+    return min(
+        settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.JOBS_RETRY_BACKOFF_MAX,
+    )
+
+
+def claim(worker, limit):
+    """Забрать до limit готовых задач, вернуть их id."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    jobs = Job.objects.filter(
+        Q(status=Job.QUEUED, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=stale)
+    ).order_by('run_at', 'pk')
+    take = {
+        'status': Job.RUNNING,
+        'locked_by': worker,
+        'locked_at': now,
+        'attempts': F('attempts') + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                jobs.select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:limit]
+            )
+            Job.objects.filter(pk__in=ids).update(**take)
+        return ids
+
+    claimed = []
+    rows = jobs.values_list('pk', 'status', 'locked_at')[:limit]
+    for pk, status, locked_at in rows:
+        # Строка достаётся тому, чей UPDATE застал её в прежнем состоянии
+        if Job.objects.filter(
+                pk=pk, status=status, locked_at=locked_at).update(**take):
+            claimed.append(pk)
+    return claimed
+
+
+def run_job(pk, worker):
+    """Выполнить задачу, забранную воркером worker, и записать результат."""
+    try:
+        job = Job.objects.get(pk=pk)
+        try:
+            payload = json.loads(job.payload)
+            TASKS[job.task](*payload['args'], **payload['kwargs'])
+        except Exception:
+            retry(job, worker, traceback.format_exc())
+        else:
+            Job.objects.filter(pk=pk, locked_by=worker).update(
+                status=Job.DONE, finished=timezone.now(), error='')
+    finally:
+        close_old_connections()
+
+
+def retry(job, worker, error):
+    """Вернуть задачу в очередь с задержкой или пометить упавшей."""
+    now = timezone.now()
+    if job.attempts >= job.max_attempts:
+        changes = {'status': Job.FAILED, 'finished': now}
+    else:
+        changes = {
+            'status': Job.QUEUED,
+            'run_at': now + timedelta(seconds=backoff(job.attempts)),
+            'locked_by': '',
+            'locked_at': None,
+        }
+    # Задачу, у которой истекла блокировка, уже забрал другой воркер
+    Job.objects.filter(pk=job.pk, locked_by=worker).update(
+        error=error, **changes)
+
+
+def heartbeat(worker, ids):
+    """Продлить блокировку выполняемых воркером задач."""
+    Job.objects.filter(
+        pk__in=ids, status=Job.RUNNING, locked_by=worker,
+    ).update(locked_at=timezone.now())
+
+
+def discover_tasks():
+    """Импортировать модули tasks.py всех приложений."""
+    autodiscover_modules('tasks')
+
+
+class Worker:
+    """Забирает задачи и выполняет их в пуле потоков или процессов."""
+
+    def __init__(self, concurrency=None, pool=None, interval=None):
+        self.concurrency = concurrency or settings.JOBS_CONCURRENCY
+        self.pool = pool or settings.JOBS_POOL
+        self.interval = interval or settings.JOBS_POLL_INTERVAL
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopped = threading.Event()
+
+    def executor(self):
+        if self.pool == 'process':
+            # spawn, а не fork: копия открытого соединения SQLite
+            # в дочернем процессе портит базу
+            return ProcessPoolExecutor(
+                self.concurrency,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=processes.start,
+            )
+        return ThreadPoolExecutor(self.concurrency)
+
+    def run(self, burst=False):
+        """Выполнять задачи; с burst — только пока очередь не опустеет."""
+        discover_tasks()
+        target = processes.run_job if self.pool == 'process' else run_job
+        running = {}
+        # Блокировка продлевается с запасом до JOBS_LOCK_TIMEOUT
+        beat_every = settings.JOBS_LOCK_TIMEOUT / 3
+        last_beat = time.monotonic()
+        with self.executor() as executor:
+            while not self.stopped.is_set():
+                running = {
+                    future: pk for future, pk in running.items()
+                    if not future.done()
+                }
+                if running and time.monotonic() - last_beat > beat_every:
+                    heartbeat(self.name, list(running.values()))
+                    last_beat = time.monotonic()
+                free = self.concurrency - len(running)
+                ids = claim(self.name, free) if free else []
+                running.update(
+                    (executor.submit(target, pk, self.name), pk)
+                    for pk in ids
+                )
+                if burst and not running:
+                    return
+                if ids:
+                    continue
+                if running:
+                    wait(running, self.interval, return_when=FIRST_COMPLETED)
+                else:
+                    self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .tasks import send_email
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Отправляет письма через очередь задач, а не в запросе.
+
+    Письма уходят в QUEUED_EMAIL_BACKEND задачей send_email после
+    коммита транзакции. Письма с вложениями в JSON не укладываются
+    и отправляются сразу.
+    """
+
+    def send_messages(self, email_messages):
+        inline = []
+        for message in email_messages:
+            if message.attachments:
+                inline.append(message)
+                continue
+            send_email.delay({
+                'subject': message.subject,
+                'body': message.body,
+                'from_email': message.from_email,
+                'to': message.to,
+                'cc': message.cc,
+                'bcc': message.bcc,
+                'reply_to': message.reply_to,
+                'headers': message.extra_headers,
+                'alternatives': getattr(message, 'alternatives', []),
+            })
+        if inline:
+            get_connection(settings.QUEUED_EMAIL_BACKEND).send_messages(
+                inline)
+        return len(email_messages)
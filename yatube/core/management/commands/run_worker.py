@@ -0,0 +1,41 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в базе (core.jobs).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.JOBS_CONCURRENCY,
+            help='Задач, выполняемых одновременно',
+        )
+        parser.add_argument(
+            '--pool', choices=('thread', 'process'),
+            default=settings.JOBS_POOL,
+            help='Пул потоков или процессов',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=settings.JOBS_POLL_INTERVAL,
+            help='Секунд между проверками пустой очереди',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда готовых задач не останется',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            options['concurrency'], options['pool'], options['interval'])
+        # Начатые задачи доделываются, новые не забираются
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: worker.stop())
+        self.stdout.write(
+            f'Воркер {worker.name}: {worker.concurrency} '
+            f'({worker.pool}), Ctrl+C для остановки'
+        )
+        worker.run(burst=options['burst'])
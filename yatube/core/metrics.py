@@ -0,0 +1,188 @@
+"""
+Гистограммы запросов к БД и времени ответа по представлениям.
+
+Данные живут в памяти процесса: каждый воркер отдаёт свои,
+а суммирует их Prometheus. Приложения добавляют свои счётчики через
+registry.add_counters.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SECONDS_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+METRICS = (
+    ('yatube_view_queries', 'SQL-запросов за запрос', QUERY_BUCKETS),
+    ('yatube_view_db_seconds', 'Время в БД, с', SECONDS_BUCKETS),
+    ('yatube_view_template_seconds', 'Время рендера шаблонов, с',
+     SECONDS_BUCKETS),
+    ('yatube_view_duration_seconds', 'Полное время ответа, с',
+     SECONDS_BUCKETS),
+)
+
+_local = threading.local()
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Пары (граница, число наблюдений не больше неё)."""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    """Гистограммы по имени метрики и представления."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = []
+
+    def add_counters(self, collect):
+        """
+        Выводить счётчики приложения вместе с гистограммами.
+
+        collect() возвращает тройки (имя, описание, значение).
+        """
+        self.counters.append(collect)
+
+    def observe(self, view, values):
+        with self.lock:
+            for (name, _, buckets), value in zip(METRICS, values):
+                key = (name, view)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(buckets)
+                self.histograms[key].observe(value)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def exposition(self):
+        """Текстовый формат Prometheus."""
+        with self.lock:
+            lines = []
+            for name, help_text, _ in METRICS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, view), histogram in sorted(
+                        self.histograms.items()):
+                    if metric != name:
+                        continue
+                    label = view.replace('\\', '\\\\').replace('"', '\\"')
+                    for bound, total in histogram.cumulative():
+                        lines.append(
+                            f'{name}_bucket{{view="{label}",le="{bound}"}} '
+                            f'{total}'
+                        )
+                    lines.append(
+                        f'{name}_sum{{view="{label}"}} {histogram.sum}')
+                    lines.append(
+                        f'{name}_count{{view="{label}"}} {histogram.count}')
+        for collect in self.counters:
+            for name, help_text, value in collect():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class RequestStats:
+    """Счётчики одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0
+        self.template_time = 0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class MetricsMiddleware:
+    """
+    Собирает запросы к БД, время в БД, рендер шаблонов и время ответа.
+
+    Запросы считает execute_wrapper, а не DEBUG-лог connection.queries,
+    поэтому middleware можно держать включённым в продакшене.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = _local.stats = RequestStats()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _local.stats = None
+        duration = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        registry.observe(view, (
+            stats.queries, stats.db_time, stats.template_time, duration,
+        ))
+        return response
+
+
+class TimedTemplate(Template):
+    """Шаблон, который добавляет время рендера к счётчикам запроса."""
+
+    def render(self, context=None, request=None):
+        stats = getattr(_local, 'stats', None)
+        if stats is None:
+            return super().render(context, request)
+        # Вложенный render_to_string уже учтён во внешнем шаблоне
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Бэкенд DjangoTemplates с замером времени рендера."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(
+            super().get_template(template_name).template, self)
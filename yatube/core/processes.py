@@ -0,0 +1,19 @@
+"""
+Точки входа процессов пула run_worker.
+
+Процессы запускаются через spawn и импортируют этот модуль до настройки
+Django, поэтому модели и core.jobs импортируются только внутри функций.
+"""
+import django
+
+
+def start():
+    """Настроить Django и найти задачи в новом процессе пула."""
+    django.setup()
+    from core.jobs import discover_tasks
+    discover_tasks()
+
+
+def run_job(pk, worker):
+    from core.jobs import run_job
+    run_job(pk, worker)
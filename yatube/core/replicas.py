@@ -0,0 +1,96 @@
+"""
+Чтение из реплик для представлений, которые только читают.
+
+Представления, помеченные replica_reads, читают из случайной реплики
+из POSTS_READ_REPLICAS, остальное идёт в основную базу. Клиент, который
+только что писал, ещё POSTS_PRIMARY_STICKINESS секунд читает из основной
+базы, чтобы видеть свои изменения несмотря на отставание реплик.
+
+Общие кеши заполняются внутри primary_reads: версии кешей сбрасывает
+запись в основную базу, и данные отстающей реплики, сохранённые под
+новой версией, жили бы в кеше до следующего изменения.
+"""
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PRIMARY_COOKIE = 'use_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+# Сессия только что вошедшего пользователя может не успеть на реплику
+PRIMARY_ONLY_APPS = ('sessions',)
+
+_state = threading.local()
+
+
+def replica_reads(view_func):
+    """Пометить представление как читающее из реплик."""
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        return view_func(*args, **kwargs)
+    wrapper.replica_reads = True
+    return wrapper
+
+
+@contextmanager
+def primary_reads():
+    """Читать внутри блока из основной базы, даже если запрос на реплике."""
+    read_db = getattr(_state, 'read_db', None)
+    _state.read_db = None
+    try:
+        yield
+    finally:
+        _state.read_db = read_db
+
+
+class ReplicaRouter:
+    """Чтение из реплики текущего запроса, запись в основную базу."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return getattr(_state, 'read_db', None)
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # В репликах те же данные, что и в основной базе
+        return True
+
+
+class ReplicaMiddleware:
+    """Выбирает реплику для чтения и закрепляет писавших за основной базой."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.read_db = None
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+            wrote = _state.wrote or request.method not in SAFE_METHODS
+        finally:
+            _state.read_db = None
+            _state.wrote = False
+        if wrote:
+            response.set_cookie(
+                PRIMARY_COOKIE, '1',
+                max_age=settings.POSTS_PRIMARY_STICKINESS,
+                httponly=True,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        replicas = settings.POSTS_READ_REPLICAS
+        if (
+            replicas
+            and getattr(view_func, 'replica_reads', False)
+            and PRIMARY_COOKIE not in request.COOKIES
+        ):
+            _state.read_db = random.choice(replicas)
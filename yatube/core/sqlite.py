@@ -0,0 +1,36 @@
+"""
+Профили настройки SQLite для каждого нового соединения.
+
+'default' оставляет умолчания SQLite. 'production' включает WAL, чтобы
+читатели не ждали писателя, ослабляет fsync до конца контрольной точки
+(synchronous=NORMAL безопасен в WAL), держит страницы в памяти и ждёт
+занятую базу busy_timeout миллисекунд вместо ошибки database is locked.
+"""
+from django.conf import settings
+
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        # отрицательное значение — размер в КиБ, около 64 МБ
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def sqlite_pragmas(profile=None):
+    """PRAGMA выбранного профиля."""
+    return SQLITE_PROFILES[profile or settings.SQLITE_PROFILE]
+
+
+def apply_sqlite_profile(sender, connection, **kwargs):
+    """Применить профиль SQLITE_PROFILE к новому соединению."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from .jobs import task
+
+
+@task
+def send_email(message):
+    """Отправить письмо, разобранное QueuedEmailBackend."""
+    alternatives = message.pop('alternatives', [])
+    email = EmailMultiAlternatives(
+        connection=get_connection(settings.QUEUED_EMAIL_BACKEND),
+        **message,
+    )
+    for content, mimetype in alternatives:
+        email.attach_alternative(content, mimetype)
+    email.send()
@@ -0,0 +1,33 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def elided_page_range(page_obj, on_each_side=3, on_ends=2):
+    """
+    Номера страниц вокруг текущей и по краям, пропуски — None.
+
+    Повторяет Paginator.get_elided_page_range из Django 3.2: список
+    не длиннее 2 * (on_each_side + on_ends) + 3 при любом числе страниц.
+    """
+    number = page_obj.number
+    # При приблизительном количестве текущая страница бывает дальше
+    # последней посчитанной
+    num_pages = max(page_obj.paginator.num_pages, number)
+    if num_pages <= (on_each_side + on_ends) * 2:
+        return list(range(1, num_pages + 1))
+
+    pages = []
+    if number > 1 + on_each_side + on_ends + 1:
+        pages += list(range(1, on_ends + 1)) + [None]
+        pages += list(range(number - on_each_side, number + 1))
+    else:
+        pages += list(range(1, number + 1))
+
+    if number < num_pages - on_each_side - on_ends - 1:
+        pages += list(range(number + 1, number + on_each_side + 1)) + [None]
+        pages += list(range(num_pages - on_ends + 1, num_pages + 1))
+    else:
+        pages += list(range(number + 1, num_pages + 1))
+    return pages
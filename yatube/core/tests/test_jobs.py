@@ -0,0 +1,162 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.jobs import (TASKS, Worker, backoff, claim, heartbeat, run_job,
+                       task)
+from core.models import Job
+
+User = get_user_model()
+
+CALLS = []
+
+
+@task
+def record(value, suffix=''):
+    CALLS.append(f'{value}{suffix}')
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError('сломалось')
+
+
+@override_settings(JOBS_RETRY_BACKOFF=10, JOBS_RETRY_BACKOFF_MAX=30,
+                   JOBS_LOCK_TIMEOUT=60, JOBS_MAX_ATTEMPTS=5)
+class JobQueueTest(TestCase):
+    """Тестирование очереди задач."""
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_task_runs_and_is_marked_done(self):
+        self.assertIs(TASKS[record.name], record)
+        job = record.enqueue(1, suffix='!')
+        self.assertEqual(job.max_attempts, 5)
+        self.assertEqual(claim('test', 10), [job.pk])
+        run_job(job.pk, 'test')
+        job.refresh_from_db()
+        self.assertEqual(CALLS, ['1!'])
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished)
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        job = record.enqueue(1)
+        self.assertEqual(claim('first', 10), [job.pk])
+        self.assertEqual(claim('second', 10), [])
+        # Задачу умершего воркера забирают после JOBS_LOCK_TIMEOUT
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=61))
+        self.assertEqual(claim('second', 10), [job.pk])
+        job.refresh_from_db()
+        self.assertEqual((job.locked_by, job.attempts), ('second', 2))
+
+    def test_heartbeat_keeps_long_job(self):
+        job = record.enqueue(1)
+        claim('first', 10)
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=50))
+        heartbeat('first', [job.pk])
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=F('locked_at') - timedelta(seconds=20))
+        self.assertEqual(claim('second', 10), [])
+
+    def test_reclaimed_job_ignores_old_worker(self):
+        """Итог пишет только воркер, который держит блокировку."""
+        job = explode.enqueue()
+        claim('first', 10)
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=61))
+        self.assertEqual(claim('second', 10), [job.pk])
+
+        run_job(job.pk, 'first')
+        job.refresh_from_db()
+        self.assertEqual(
+            (job.status, job.locked_by, job.error),
+            (Job.RUNNING, 'second', ''),
+        )
+
+    def test_scheduled_job_waits(self):
+        job = record.enqueue(1)
+        Job.objects.filter(pk=job.pk).update(
+            run_at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(claim('test', 10), [])
+
+    def test_failed_job_retries_with_backoff(self):
+        self.assertEqual([backoff(n) for n in (1, 2, 3)], [10, 20, 30])
+        job = explode.enqueue()
+        claim('test', 1)
+        run_job(job.pk, 'test')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('сломалось', job.error)
+        self.assertGreater(
+            job.run_at, timezone.now() + timedelta(seconds=9))
+        self.assertEqual(claim('test', 1), [])
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        claim('test', 1)
+        run_job(job.pk, 'test')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+
+class DelayTest(TransactionTestCase):
+    """Тестирование постановки в очередь после коммита и воркера."""
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_delay_enqueues_on_commit(self):
+        with transaction.atomic():
+            record.delay('a')
+            self.assertFalse(Job.objects.exists())
+        self.assertEqual(Job.objects.get().task, record.name)
+
+        try:
+            with transaction.atomic():
+                record.delay('b')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_worker_runs_queue_in_pool(self):
+        for value in range(6):
+            record.enqueue(value)
+        Worker(concurrency=2, pool='thread', interval=0.01).run(burst=True)
+        self.assertEqual(sorted(CALLS), [str(value) for value in range(6)])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 6)
+
+    def test_run_worker_command(self):
+        record.enqueue('command')
+        call_command('run_worker', burst=True, concurrency=1,
+                     stdout=StringIO())
+        self.assertEqual(CALLS, ['command'])
+
+    @override_settings(
+        EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+        QUEUED_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    )
+    def test_password_reset_mail_is_queued(self):
+        User.objects.create_user(
+            'reset', 'reset@example.com', 'password')
+        response = self.client.post(
+            reverse('password_reset'), {'email': 'reset@example.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(Job.objects.get().task, 'core.tasks.send_email')
+
+        Worker(concurrency=1, interval=0.01).run(burst=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['reset@example.com'])
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.metrics import Histogram, registry
+from posts.models import Post
+
+User = get_user_model()
+
+
+class HistogramTest(TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 7):
+            histogram.observe(value)
+        self.assertEqual(
+            list(histogram.cumulative()), [(1, 2), (5, 3), ('+Inf', 4)])
+        self.assertEqual(histogram.sum, 11)
+
+
+class MetricsMiddlewareTest(TestCase):
+    """Тестирование сбора и выдачи метрик представлений."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='metrics', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.client = Client()
+
+    def test_view_is_recorded(self):
+        self.client.get(reverse('posts:index'))
+        self.client.force_login(self.staff)
+        content = self.client.get(reverse('metrics')).content.decode()
+
+        self.assertIn('# TYPE yatube_view_queries histogram', content)
+        self.assertIn(
+            'yatube_view_duration_seconds_count{view="posts:index"} 1',
+            content,
+        )
+        self.assertIn(
+            'yatube_view_template_seconds_bucket'
+            '{view="posts:index",le="+Inf"} 1',
+            content,
+        )
+        queries = next(
+            line for line in content.splitlines()
+            if line.startswith('yatube_view_queries_sum{view="posts:index"}')
+        )
+        self.assertGreater(float(queries.split()[-1]), 0)
+
+    def test_fragment_counters(self):
+        Post.objects.create(author=self.staff, text='Пост для метрик')
+        self.client.get(reverse('posts:index'))
+        self.client.force_login(self.staff)
+        content = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn(
+            '# TYPE yatube_fragment_cache_misses_total counter', content)
+        self.assertIn('yatube_fragment_cache_misses_total 1', content)
+        self.assertIn('yatube_fragment_cache_hits_total 0', content)
+
+    def test_staff_only(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 302)
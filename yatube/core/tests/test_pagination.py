@@ -0,0 +1,47 @@
+from django.core.paginator import Paginator
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from core.templatetags.pagination import elided_page_range
+
+
+class ElidedPageRangeTest(SimpleTestCase):
+    """Тестирование сокращённого списка страниц паджинатора."""
+
+    def page(self, number, num_pages=50000):
+        return Paginator(range(num_pages), 1).page(number)
+
+    def test_short_range_is_complete(self):
+        self.assertEqual(
+            elided_page_range(self.page(3, num_pages=10)),
+            list(range(1, 11)),
+        )
+
+    def test_middle_page(self):
+        self.assertEqual(
+            elided_page_range(self.page(25000)),
+            [1, 2, None, 24997, 24998, 24999, 25000, 25001, 25002, 25003,
+             None, 49999, 50000],
+        )
+
+    def test_edges(self):
+        self.assertEqual(
+            elided_page_range(self.page(1)),
+            [1, 2, 3, 4, None, 49999, 50000],
+        )
+        self.assertEqual(
+            elided_page_range(self.page(50000)),
+            [1, 2, None, 49997, 49998, 49999, 50000],
+        )
+
+    def test_template_renders_constant_size(self):
+        """Вёрстка паджинатора не растёт с числом страниц."""
+        template = Template("{% include 'includes/paginator.html' %}")
+        sizes = [
+            len(template.render(Context({
+                'page_obj': self.page(500, num_pages=num_pages),
+            })))
+            for num_pages in (1000, 100000)
+        ]
+        # разница только в цифрах номеров последних страниц
+        self.assertLess(sizes[1] - sizes[0], 20)
@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.replicas import PRIMARY_COOKIE
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POSTS_READ_REPLICAS=['replica'])
+class ReplicaRoutingTest(TestCase):
+    """Тестирование чтения из реплики на отдельной базе SQLite."""
+
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='primary_author')
+        cls.group = Group.objects.create(title='Группа', slug='replica-group')
+        # В «реплику» попадает только часть данных: по ним видно,
+        # из какой базы читала страница
+        User.objects.using('replica').bulk_create([User(
+            id=cls.author.pk,
+            username=cls.author.username,
+            password=cls.author.password,
+        )])
+        replica_author = User.objects.db_manager('replica').create_user(
+            username='replica_author')
+        post = Post(author=replica_author, text='Пост из реплики')
+        # bulk_create не вызывает save(), который рендерит текст
+        post.render_text()
+        Post.objects.using('replica').bulk_create([post])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_read_only_views_use_replica(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Пост из реплики')
+
+    def test_cache_fills_read_primary(self):
+        """Отстающая реплика не попадает в общие кеши."""
+        Post.objects.create(author=self.author, text='Уже в основной')
+        self.assertFalse(Post.objects.using('replica').filter(
+            text='Уже в основной').exists())
+
+        # Анонимная страница кешируется и рендерится по основной базе
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Уже в основной')
+        self.assertNotContains(response, 'Пост из реплики')
+        response = self.client.get(reverse('posts:feed'))
+        self.assertContains(response, 'Уже в основной')
+        # Автора из реплики нет в основной базе, и в кеш он не попадает
+        response = self.client.get(reverse(
+            'posts:profile', kwargs={'username': 'replica_author'}))
+        self.assertEqual(response.status_code, 404)
+
+        # Вошедший читатель без кешей страниц по-прежнему на реплике
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Пост из реплики')
+
+    def test_other_views_use_primary(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertNotContains(response, 'Пост из реплики')
+
+    def test_writer_sticks_to_primary(self):
+        self.client.force_login(self.author)
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Свежий пост'})
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+        self.assertTrue(Post.objects.filter(text='Свежий пост').exists())
+        self.assertFalse(
+            Post.objects.using('replica').filter(text='Свежий пост').exists())
+
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Свежий пост')
+        self.assertNotContains(response, 'Пост из реплики')
+
+    def test_sessions_stay_on_primary(self):
+        """Вход виден сразу, хотя сессии в реплике нет."""
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('posts:index'))
+        self.assertTrue(response.context['user'].is_authenticated)
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
@@ -0,0 +1,27 @@
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+
+class SqliteProfileTest(SimpleTestCase):
+    """Тестирование PRAGMA профилей SQLite для новых соединений."""
+
+    databases = {'default'}
+
+    def pragma(self, name, profile):
+        with override_settings(SQLITE_PROFILE=profile):
+            fresh = connection.copy()
+            try:
+                with fresh.cursor() as cursor:
+                    cursor.execute(f'PRAGMA {name}')
+                    return cursor.fetchone()[0]
+            finally:
+                fresh.close()
+
+    def test_production_profile(self):
+        self.assertEqual(self.pragma('busy_timeout', 'production'), 5000)
+        self.assertEqual(self.pragma('cache_size', 'production'), -64000)
+        # synchronous=NORMAL
+        self.assertEqual(self.pragma('synchronous', 'production'), 1)
+
+    def test_default_profile_keeps_sqlite_defaults(self):
+        self.assertEqual(self.pragma('synchronous', 'default'), 2)
@@ -0,0 +1,13 @@
+from django.contrib.auth.decorators import user_passes_test
+from django.http import HttpResponse
+
+from .metrics import registry
+
+
+@user_passes_test(lambda user: user.is_staff)
+def metrics(request):
+    """Гистограммы представлений в формате Prometheus для персонала."""
+    return HttpResponse(
+        registry.exposition(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
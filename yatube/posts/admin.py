@@ -1,6 +1,19 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
 
-from .models import Post, Group
+from .models import AuthorPurge, Post, Group
+from .moderation import Moderation
+from .paginators import CachedCountPaginator, CursorPaginator, encode_cursor
+from .search import search_posts
+
+# Курсор keyset-страниц списка постов, см. PostChangeList
+CURSOR_VAR = 'after'
 
 
 class GroupAdmin(admin.ModelAdmin):
@@ -10,6 +23,110 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = "-пусто-"
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Паджинатор списка постов в админке.
+
+    Количество без фильтров берётся из кеша главной ленты, с фильтрами
+    считается не дальше POSTS_ADMIN_COUNT_LIMIT строк. OFFSET страницы
+    проходит только индекс по (pub_date, id) за ключами, а сами строки
+    выбираются по ним отдельно.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.has_filters():
+            return CachedCountPaginator(
+                self.object_list, self.per_page, 'index').count
+        limit = settings.POSTS_ADMIN_COUNT_LIMIT
+        return self.object_list[:limit].count()
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        keys = list(
+            self.object_list.values_list('pk', 'pub_date', named=True)
+            [bottom:bottom + self.per_page]
+        )
+        # Курсор после последней строки для перехода на keyset-страницы
+        self.last_key = keys[-1] if keys else None
+        rows = self.object_list.filter(pk__in=[key.pk for key in keys])
+        return self._get_page(rows, number, self)
+
+
+class PostChangeList(ChangeList):
+    """Список постов с keyset-страницами ?after= после первых страниц."""
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        params.pop(CURSOR_VAR, None)
+        return params
+
+    def get_results(self, request):
+        self.keyset_page = False
+        self.next_url = None
+        # Курсор задан по (pub_date, id), то есть по порядку по умолчанию
+        keyset = ORDER_VAR not in request.GET
+        cursor = request.GET.get(CURSOR_VAR) if keyset else None
+        if not cursor:
+            super().get_results(request)
+            last_key = getattr(self.paginator, 'last_key', None)
+            if keyset and self.multi_page and last_key:
+                self.next_url = self.cursor_url(encode_cursor(last_key))
+            return
+
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page)
+        page = CursorPaginator(
+            self.queryset.select_related(None).only('pk', 'pub_date'),
+            self.list_per_page,
+            after=cursor,
+        ).page()
+        self.result_list = self.queryset.filter(
+            pk__in=[post.pk for post in page])
+        self.result_count = self.paginator.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = True
+        self.keyset_page = True
+        self.first_url = self.get_query_string(
+            remove=[CURSOR_VAR, PAGE_VAR])
+        if page.has_next():
+            self.next_url = self.cursor_url(page.next_cursor)
+
+    def cursor_url(self, cursor):
+        return self.get_query_string({CURSOR_VAR: cursor}, [PAGE_VAR])
+
+
+class GroupChoiceField(forms.ModelChoiceField):
+    """Выбор группы со списком вариантов, прочитанным один раз на запрос."""
+    choices_list = None
+
+    def _set_queryset(self, queryset):
+        # Каждая форма строки list_editable копирует поле и заново
+        # задаёт queryset, и виджет читал бы группы на каждую строку
+        super()._set_queryset(queryset)
+        if self.choices_list is not None:
+            self.widget.choices = self.choices_list
+
+    queryset = property(forms.ModelChoiceField._get_queryset, _set_queryset)
+
+
+class ConfirmForm(forms.Form):
+    """Подтверждение массового действия над постами."""
+
+
+class MoveToGroupForm(ConfirmForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        empty_label='Без группы',
+        label='Группа',
+    )
+
+
 class PostAdmin(admin.ModelAdmin):
     list_display = (
         'pk',
@@ -19,12 +136,98 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    # Без COUNT(*) по всей таблице при каждом открытии списка
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    actions = ('move_to_group', 'delete_posts')
     empty_value_display = '-пусто-'
 
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name != 'group':
+            return super().formfield_for_foreignkey(
+                db_field, request, **kwargs)
+        kwargs['form_class'] = GroupChoiceField
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs)
+        if not hasattr(request, '_group_choices'):
+            request._group_choices = [choice for choice in formfield.choices]
+        formfield.choices_list = request._group_choices
+        formfield.widget.choices = request._group_choices
+        return formfield
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Стандартное удаление читает каждый пост и шлёт сигналы по строке
+        actions.pop('delete_selected', None)
+        return actions
+
+    def moderate(self, request, queryset, form_class, title, apply):
+        """Страница подтверждения, затем apply(queryset, cleaned_data)."""
+        form = form_class(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            done = apply(queryset, form.cleaned_data)
+            self.message_user(request, f'{title}: обработано постов {done}')
+            return None
+        context = {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'opts': self.model._meta,
+            'form': form,
+            'action': request.POST['action'],
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(
+            request, 'admin/posts/post/moderate.html', context)
+
+    def move_to_group(self, request, queryset):
+        return self.moderate(
+            request, queryset, MoveToGroupForm, 'Перенос в группу',
+            lambda posts, data: Moderation().move(posts, data['group']),
+        )
+    move_to_group.short_description = 'Перенести в группу'
+    move_to_group.allowed_permissions = ('change',)
+
+    def delete_posts(self, request, queryset):
+        return self.moderate(
+            request, queryset, ConfirmForm, 'Удаление постов',
+            lambda posts, data: Moderation().delete(posts),
+        )
+    delete_posts.short_description = 'Удалить выбранные посты'
+    delete_posts.allowed_permissions = ('delete',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Вместо LIKE '%term%' по всей таблице ищем через FTS5
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
+
+class AuthorPurgeAdmin(admin.ModelAdmin):
+    """Ход удаления авторов, записи ведёт posts.purges."""
+    list_display = (
+        'username', 'status', 'posts_deleted', 'created', 'finished')
+    list_filter = ('status',)
+    search_fields = ('username',)
+    readonly_fields = (
+        'author', 'username', 'status', 'posts_deleted', 'error',
+        'created', 'updated', 'finished',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
 
 # При регистрации модели Post источником конфигурации для неё назначаем
 # класс PostAdmin
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Post, PostAdmin)
+admin.site.register(AuthorPurge, AuthorPurgeAdmin)
@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def restore_search_triggers(sender, using, **kwargs):
+    # Миграции SQLite пересоздают posts_post и теряют триггеры FTS5
+    from .search import restore_search_triggers
+    restore_search_triggers(connections[using])
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
     verbose_name: str = 'Управление постами'
+
+    def ready(self):
+        # Регистрируем обработчики сигналов
+        from . import checks, signals  # noqa: F401
+        post_migrate.connect(restore_search_triggers, sender=self)
+
+        from core.metrics import registry
+
+        from .fragments import fragment_counters
+        registry.add_counters(fragment_counters)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+# Бэкенды, данные которых живут в памяти одного процесса
+LOCAL_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """Метки версий кешей должны быть видны всем процессам."""
+    if settings.CACHES['default']['BACKEND'] not in LOCAL_BACKENDS:
+        return []
+    if settings.POSTS_LOOKUP_SHARED_CACHE:
+        return [Error(
+            'POSTS_LOOKUP_SHARED_CACHE включён, а кеш по умолчанию '
+            'локален для процесса.',
+            hint='Настройте в CACHES общий бэкенд: файлы, базу данных, '
+                 'memcached или redis.',
+            id='posts.E001',
+        )]
+    return [Warning(
+        'Кеш по умолчанию локален для процесса: сброс кешей страниц, '
+        'лент и справочников не дойдёт до других процессов.',
+        hint='Настройте в CACHES общий бэкенд.',
+        id='posts.W001',
+    )]
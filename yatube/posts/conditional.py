@@ -0,0 +1,168 @@
+"""
+Условные GET (ETag и Last-Modified) для лент и страницы поста.
+
+Валидаторы считаются без рендера: время последней правки и количество
+постов, которое берётся из кеша паджинатора. Они кешируются вместе
+с версией ленты из page_cache, которую сигналы увеличивают при любом
+изменении ленты, её группы или автора, так что запрос к базе
+выполняется один раз на изменение, а ответ 304 на повторную проверку
+обходится одним обращением к кешу. Ленты отдают только ETag: удаление
+не самого нового поста не меняет дату последней правки.
+
+Ответы 304 получают только анонимные читатели: страница пользователя
+зависит ещё и от него самого (шапка, кнопка подписки).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+
+from core.replicas import primary_reads
+
+from .lookups import groups, users
+from .models import Post
+from .page_cache import VERSION_KEY
+from .paginators import count_cache_key
+
+VALIDATORS_KEY = 'posts:validators:{}'
+
+
+def _versions(scopes):
+    """Текущие версии лент, недостающие заводятся заново."""
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in set(keys) - set(versions):
+        cache.add(key, 1, None)
+        versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def cached_for_scopes(key, scopes, compute):
+    """
+    (версии, compute()), пока версии лент scopes не изменились.
+
+    Версии читаются до compute: изменение между ними увеличит версию,
+    и устаревшая запись больше не совпадёт. compute читает из основной
+    базы: отстающая реплика сохранила бы старые данные под новой версией.
+    """
+    versions = _versions(scopes)
+    entry = cache.get(key)
+    if entry and entry[0] == versions:
+        return entry
+    with primary_reads():
+        entry = versions, compute()
+    cache.set(key, entry, settings.POSTS_PAGE_CACHE_TIMEOUT)
+    return entry
+
+
+def scope_posts(scope):
+    """Посты ленты по её имени из feed_scopes."""
+    if scope == 'index':
+        return Post.objects.all()
+    kind, pk = scope.split(':')
+    return Post.objects.filter(**{f'{kind}_id': pk})
+
+
+def feed_validators(scope):
+    """(последняя правка, количество постов, версия) ленты."""
+    def compute():
+        posts = scope_posts(scope).order_by()
+        # Количество берётся из кеша паджинатора, который сигналы правят
+        # на месте; COUNT(*) нужен, только пока его там нет
+        count = cache.get(count_cache_key(scope))
+        if count is not None:
+            return posts.aggregate(Max('updated'))['updated__max'], count
+        aggregate = posts.aggregate(
+            last_modified=Max('updated'), count=Count('pk'))
+        # Количество заодно достаётся паджинатору ленты
+        count = aggregate['count']
+        limit = getattr(settings, 'POSTS_COUNT_APPROXIMATE_LIMIT', None)
+        cache.add(
+            count_cache_key(scope),
+            min(count, limit) if limit else count,
+            settings.POSTS_COUNT_CACHE_TIMEOUT,
+        )
+        return aggregate['last_modified'], count
+
+    versions, validators = cached_for_scopes(
+        VALIDATORS_KEY.format(scope), [scope], compute)
+    return (*validators, *versions)
+
+
+def _memoized(func):
+    """Валидаторы считаются один раз на запрос для обоих заголовков."""
+    def wrapper(request, *args, **kwargs):
+        if not hasattr(request, '_validators'):
+            request._validators = (
+                None if request.user.is_authenticated
+                else func(*args, **kwargs)
+            )
+        return request._validators
+    return wrapper
+
+
+def _conditional(validators, last_modified=True):
+    validators = _memoized(validators)
+
+    def etag(request, *args, **kwargs):
+        found = validators(request, *args, **kwargs)
+        if found is None:
+            return None
+        last_modified, *rest = found
+        stamp = last_modified.timestamp() if last_modified else 0
+        return '-'.join(map(str, [stamp, *rest]))
+
+    def modified(request, *args, **kwargs):
+        found = validators(request, *args, **kwargs)
+        return found[0] if found else None
+
+    return condition(
+        etag_func=etag,
+        last_modified_func=modified if last_modified else None,
+    )
+
+
+def _feed(scope):
+    # Версия в ETag ловит изменения, которые не трогают посты:
+    # переименование автора или правку группы
+    return (*feed_validators(scope), scope) if scope else None
+
+
+def _index():
+    return _feed('index')
+
+
+def _group(slug):
+    group = groups.get(slug)
+    return _feed(f'group:{group.pk}') if group else None
+
+
+def _author(username):
+    author = users.get(username)
+    return _feed(f'author:{author.pk}') if author else None
+
+
+def _post(post_id):
+    """
+    Правка поста, счётчик автора и версии лент автора и группы.
+
+    Строка поста читается по первичному ключу на каждый запрос: это
+    дешевле кеша, который пришлось бы сбрасывать вместе со счётчиком.
+    """
+    row = Post.objects.filter(pk=post_id).values_list(
+        'updated', 'author_id', 'group_id',
+        'author__post_counter__posts_count',
+    ).first()
+    if row is None:
+        return None
+    updated, author_id, group_id, posts_count = row
+    scopes = [f'author:{author_id}']
+    if group_id:
+        scopes.append(f'group:{group_id}')
+    return (updated, posts_count or 0, *_versions(scopes))
+
+
+index_condition = _conditional(_index, last_modified=False)
+group_condition = _conditional(_group, last_modified=False)
+profile_condition = _conditional(_author, last_modified=False)
+post_condition = _conditional(_post)
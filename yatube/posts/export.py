@@ -0,0 +1,59 @@
+"""Потоковая выгрузка постов в JSONL и CSV."""
+import csv
+import json
+
+from django.conf import settings
+
+FIELDS = ('text', 'author', 'group', 'pub_date')
+FORMATS = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def iter_posts(queryset, chunk_size=None):
+    """
+    Обходит посты пачками по возрастанию pk.
+
+    Каждая пачка — отдельный короткий запрос pk > последнего,
+    поэтому курсор не держится открытым на всё время выгрузки,
+    а в памяти одновременно лежит не больше одной пачки.
+    """
+    chunk_size = chunk_size or settings.POSTS_EXPORT_CHUNK_SIZE
+    rows = queryset.order_by('pk').values_list(
+        'pk', 'text', 'author__username', 'group__slug', 'pub_date')
+    last_pk = 0
+    while True:
+        chunk = list(rows.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        for pk, text, author, group, pub_date in chunk:
+            yield {
+                'text': text,
+                'author': author,
+                'group': group or '',
+                'pub_date': pub_date.isoformat(),
+            }
+        last_pk = chunk[-1][0]
+
+
+class Echo:
+    """Файл, который не пишет, а возвращает строку для генератора."""
+
+    def write(self, value):
+        return value
+
+
+def export_lines(queryset, fmt='jsonl', chunk_size=None):
+    """Строки выгрузки в формате, который понимает import_posts."""
+    posts = iter_posts(queryset, chunk_size)
+    if fmt == 'csv':
+        writer = csv.DictWriter(Echo(), fieldnames=FIELDS)
+        # writeheader() возвращает строку только с Python 3.8,
+        # а writerow() — во всех версиях
+        yield writer.writerow(dict(zip(FIELDS, FIELDS)))
+        for post in posts:
+            yield writer.writerow(post)
+        return
+    for post in posts:
+        yield json.dumps(post, ensure_ascii=False) + '\n'
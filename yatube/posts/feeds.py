@@ -0,0 +1,162 @@
+"""
+RSS и Atom для главной ленты, групп и авторов.
+
+Готовые байты ленты кешируются под версией её ленты из page_cache
+до следующей записи поста в ней отдельно для каждого хоста (ссылки
+в ленте абсолютные) вместе с Last-Modified, а сильный ETag — хеш
+этих байтов, так что опрашивающие читалки получают 304 или готовый
+ответ из кеша.
+"""
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.html import escape
+from django.utils.http import parse_http_date_safe
+
+from .conditional import cached_for_scopes
+from .lookups import groups, users
+from .models import Post
+
+# Номер в ключе: старые записи, ещё без Last-Modified, не подойдут
+FEED_KEY = 'posts:feed:2:{}'
+# Только поля, которые попадают в ленту
+FEED_FIELDS = (
+    'excerpt', 'text_html', 'pub_date', 'updated',
+    'author__username', 'author__first_name', 'author__last_name',
+)
+
+
+class PostsFeed(Feed):
+    """Последние посты сайта."""
+    title = 'Yatube: последние обновления'
+    description = 'Свежие посты'
+    # Лента только читает базу, см. core/replicas.py
+    replica_reads = True
+
+    def __call__(self, request, *args, **kwargs):
+        scope = self.get_scope(request, *args, **kwargs)
+
+        def render():
+            response = super(PostsFeed, self).__call__(
+                request, *args, **kwargs)
+            return (
+                response.content,
+                response['Content-Type'],
+                quote_etag(md5(response.content).hexdigest()),
+                response.get('Last-Modified'),
+            )
+
+        _, (content, content_type, etag, last_modified) = cached_for_scopes(
+            FEED_KEY.format(request.get_host() + request.path),
+            [scope], render)
+        response = get_conditional_response(
+            request, etag=etag,
+            last_modified=parse_http_date_safe(last_modified or ''))
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = last_modified
+        return response
+
+    def get_scope(self, request, *args, **kwargs):
+        return 'index'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        posts = self.posts(obj).select_related('author').only(*FEED_FIELDS)
+        return posts[:settings.POSTS_FEED_SIZE]
+
+    def item_title(self, post):
+        # Читалки разбирают заголовок как HTML, как и описание
+        return escape(str(post))
+
+    def item_description(self, post):
+        # Уже экранированный при сохранении HTML текста
+        return post.text_html
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', kwargs={'post_id': post.pk})
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+
+class GroupPostsFeed(PostsFeed):
+    """Последние посты группы."""
+
+    def get_object(self, request, slug):
+        return groups.get_or_404(slug)
+
+    def get_scope(self, request, slug):
+        return f'group:{self.get_object(request, slug).pk}'
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description or group.title
+
+    def link(self, group):
+        return reverse('posts:group_posts', kwargs={'slug': group.slug})
+
+    def posts(self, group):
+        return Post.objects.filter(group=group)
+
+
+class AuthorPostsFeed(PostsFeed):
+    """Последние посты автора."""
+
+    def get_object(self, request, username):
+        return users.get_or_404(username)
+
+    def get_scope(self, request, username):
+        return f'author:{self.get_object(request, username).pk}'
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Посты пользователя {author.username}'
+
+    def link(self, author):
+        return reverse(
+            'posts:profile', kwargs={'username': author.username})
+
+    def posts(self, author):
+        return Post.objects.filter(author=author)
+
+
+class PostsAtomFeed(PostsFeed):
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, group):
+        return self.description(group)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return self.description(author)
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from .models import PostCounter
+
+# Версия в ключе меняется вместе с шаблоном строки
+FRAGMENT_KEY = 'posts:fragment:v2:{}'
+HITS_KEY = 'posts:fragment:hits'
+MISSES_KEY = 'posts:fragment:misses'
+AUTHOR_VERSION_KEY = 'posts:fragment-version:author:{}'
+GROUP_VERSION_KEY = 'posts:fragment-version:group:{}'
+
+
+def fragment_key(post_id):
+    return FRAGMENT_KEY.format(post_id)
+
+
+def _version_keys(post):
+    keys = [AUTHOR_VERSION_KEY.format(post.author_id)]
+    if post.group_id:
+        keys.append(GROUP_VERSION_KEY.format(post.group_id))
+    return keys
+
+
+def _versions(keys):
+    """Версии авторов и групп, недостающие заводятся заново."""
+    versions = cache.get_many(keys)
+    for key in set(keys) - set(versions):
+        cache.add(key, 1, None)
+        versions[key] = cache.get(key)
+    return versions
+
+
+def fragment_version(post, versions):
+    """
+    Версия строки: меняется при правке поста, новом посте автора
+    и изменении автора или группы, которые выводятся в строке.
+    """
+    return (
+        post.updated.timestamp(),
+        PostCounter.for_author(post.author),
+        *(versions.get(key) for key in _version_keys(post)),
+    )
+
+
+def _count(key, value):
+    if not value:
+        return
+    try:
+        cache.incr(key, value)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, value)
+
+
+def render_post_rows(posts):
+    """
+    Отрендерить строки ленты, беря готовые фрагменты из кеша.
+
+    Все фрагменты страницы читаются одним get_many, а промахи
+    рендерятся заново и сохраняются одним set_many.
+    """
+    posts = list(posts)
+    cached = cache.get_many([fragment_key(post.pk) for post in posts])
+    versions = _versions(list({
+        key for post in posts for key in _version_keys(post)}))
+    rows, missed = [], {}
+    for post in posts:
+        key = fragment_key(post.pk)
+        version = fragment_version(post, versions)
+        entry = cached.get(key)
+        if entry and entry[0] == version:
+            rows.append(entry[1])
+            continue
+        html = render_to_string('includes/post_row.html', {'post': post})
+        missed[key] = (version, html)
+        rows.append(html)
+    if missed:
+        cache.set_many(missed, settings.POSTS_FRAGMENT_CACHE_TIMEOUT)
+    _count(HITS_KEY, len(posts) - len(missed))
+    _count(MISSES_KEY, len(missed))
+    return rows
+
+
+def invalidate_post_fragments(post_ids):
+    """Сбросить закешированные строки постов."""
+    cache.delete_many([fragment_key(post_id) for post_id in post_ids])
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Версии нет — старые строки с ней и так не совпадут
+        pass
+
+
+def invalidate_author_fragments(author_id):
+    """Сбросить строки всех постов автора одной записью в кеш."""
+    _bump(AUTHOR_VERSION_KEY.format(author_id))
+
+
+def invalidate_group_fragments(group_id):
+    """Сбросить строки всех постов группы одной записью в кеш."""
+    _bump(GROUP_VERSION_KEY.format(group_id))
+
+
+def fragment_stats():
+    """Счётчики попаданий и промахов кеша фрагментов."""
+    stats = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {
+        'hits': stats.get(HITS_KEY, 0),
+        'misses': stats.get(MISSES_KEY, 0),
+    }
+
+
+def fragment_counters():
+    """Счётчики кеша фрагментов для /metrics."""
+    stats = fragment_stats()
+    return (
+        ('yatube_fragment_cache_hits_total',
+         'Строки ленты из кеша фрагментов', stats['hits']),
+        ('yatube_fragment_cache_misses_total',
+         'Строки ленты, отрендеренные заново', stats['misses']),
+    )
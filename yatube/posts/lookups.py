@@ -0,0 +1,117 @@
+"""
+Кеш групп по slug и пользователей по username.
+
+Строки крошечные и почти не меняются, а нужны каждой странице группы
+и профиля. Поэтому они лежат в ограниченном LRU процесса и, если
+включено POSTS_LOOKUP_SHARED_CACHE, ещё и в общем кеше. Кешируются
+только колонки, которые читают шаблоны и представления. Сигналы
+сохранения и удаления меняют метку версии изменённой строки
+в общем кеше, и её записи во всех процессах перестают совпадать.
+Записи LRU живут не дольше POSTS_LOOKUP_LOCAL_TIMEOUT секунд.
+"""
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+
+from core.replicas import primary_reads
+
+from .models import Group
+
+User = get_user_model()
+
+
+class LookupCache:
+    """LRU объектов модели по уникальному полю."""
+
+    def __init__(self, model, field, fields=None):
+        self.model = model
+        self.field = field
+        self.name = model._meta.label_lower
+        self.fields = list(fields) if fields else [
+            f.attname for f in model._meta.concrete_fields]
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def version_key(self, value):
+        return f'posts:lookup-version:{self.name}:{value}'
+
+    def version(self, value):
+        key = self.version_key(value)
+        version = cache.get(key)
+        if version is None:
+            # Метка, а не счётчик: после вытеснения из кеша
+            # старые записи не совпадут с новой версией
+            cache.add(key, uuid4().hex, None)
+            version = cache.get(key)
+        return version
+
+    def invalidate(self, *values):
+        """Сбросить записи значений во всех процессах."""
+        cache.set_many(
+            {self.version_key(value): uuid4().hex for value in values}, None)
+        with self.lock:
+            for value in values:
+                self.entries.pop(value, None)
+
+    def get(self, value):
+        """Новый экземпляр модели или None, если строки нет."""
+        version = self.version(value)
+        with self.lock:
+            entry = self.entries.get(value)
+            if (entry and entry[0] == version
+                    and entry[2] > time.monotonic()):
+                self.entries.move_to_end(value)
+                return self.build(entry[1])
+
+        row = None
+        shared_key = f'posts:lookup:{self.name}:{value}'
+        if settings.POSTS_LOOKUP_SHARED_CACHE:
+            shared = cache.get(shared_key)
+            if shared and shared[0] == version:
+                row = shared[1]
+        if row is None:
+            # Строка ложится в кеш под текущей версией, поэтому читается
+            # не из реплики, которая может ещё не видеть изменения
+            with primary_reads():
+                row = self.model._default_manager.filter(
+                    **{self.field: value}).values_list(*self.fields).first()
+            if row is None:
+                return None
+            if settings.POSTS_LOOKUP_SHARED_CACHE:
+                cache.set(shared_key, (version, row),
+                          settings.POSTS_LOOKUP_CACHE_TIMEOUT)
+
+        with self.lock:
+            self.entries[value] = (
+                version, row,
+                time.monotonic() + settings.POSTS_LOOKUP_LOCAL_TIMEOUT,
+            )
+            self.entries.move_to_end(value)
+            while len(self.entries) > settings.POSTS_LOOKUP_CACHE_SIZE:
+                self.entries.popitem(last=False)
+        return self.build(row)
+
+    def build(self, row):
+        # Каждому запросу свой экземпляр: в общем закешировались бы
+        # связанные объекты, например счётчик постов
+        return self.model.from_db('default', self.fields, row)
+
+    def get_or_404(self, value):
+        instance = self.get(value)
+        if instance is None:
+            raise Http404(f'{self.model._meta.object_name} не найден')
+        return instance
+
+
+groups = LookupCache(Group, 'slug')
+# Пароль, почта и права в общий кеш не попадают
+users = LookupCache(
+    User, 'username',
+    fields=('id', 'username', 'first_name', 'last_name', 'is_active'),
+)
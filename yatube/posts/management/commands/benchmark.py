@@ -0,0 +1,204 @@
+import json
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+from mixer.backend.django import mixer
+
+from posts.models import Group, Post, PostCounter
+
+User = get_user_model()
+
+
+def percentile(values, percent):
+    """Процентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[int(rank)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет скорость страниц постов на сгенерированных данных '
+        'во временной базе и сравнивает результат с базовым.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Замеряемых запросов на каждую страницу',
+        )
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Файл для результатов в JSON')
+        parser.add_argument(
+            '--baseline',
+            help='JSON прошлого прогона: упасть, если стало хуже',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост p95, доля от базового значения',
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options['seed'])
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed()
+            results = {
+                name: self.measure(scenario)
+                for name, scenario in self.scenarios()
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'config': {
+                key: options[key]
+                for key in ('users', 'groups', 'posts', 'requests', 'seed')
+            },
+            'results': results,
+        }
+        self.print_table(results)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+        if options['baseline']:
+            self.compare(results, options['baseline'])
+
+    def seed(self):
+        """Наполнить временную базу данными."""
+        options = self.options
+        faker = Faker('ru_RU')
+        faker.seed_instance(options['seed'])
+        self.users = mixer.cycle(options['users']).blend(
+            User, username=mixer.sequence('bench_user_{0}'))
+        self.groups = mixer.cycle(options['groups']).blend(
+            Group, slug=mixer.sequence('bench-group-{0}'))
+
+        now = timezone.now()
+        posts = []
+        for _ in range(options['posts']):
+            post = Post(
+                text=faker.text(max_nb_chars=400),
+                author=self.random.choice(self.users),
+                group=self.random.choice(self.groups + [None]),
+            )
+            post.render_text()
+            posts.append(post)
+        Post.objects.bulk_create(posts, batch_size=1000)
+        # pub_date проставлен auto_now_add, разносим посты по году
+        posts = list(Post.objects.only('pk'))
+        for post in posts:
+            post.pub_date = post.updated = now - timedelta(
+                minutes=self.random.randrange(60 * 24 * 365))
+        Post.objects.bulk_update(
+            posts, ['pub_date', 'updated'], batch_size=500)
+        PostCounter.rebuild()
+        self.post_ids = list(Post.objects.values_list('pk', flat=True))
+
+    def scenarios(self):
+        anonymous = Client()
+        reader = Client()
+        reader.force_login(self.users[0])
+        pick = self.random.choice
+
+        def page():
+            return {'page': self.random.randint(1, 5)}
+
+        yield 'index_anonymous', lambda: anonymous.get(
+            reverse('posts:index'), page())
+        yield 'index', lambda: reader.get(reverse('posts:index'), page())
+        yield 'group_posts', lambda: reader.get(reverse(
+            'posts:group_posts', kwargs={'slug': pick(self.groups).slug}))
+        yield 'profile', lambda: reader.get(reverse(
+            'posts:profile', kwargs={'username': pick(self.users).username}))
+        yield 'post_detail', lambda: reader.get(reverse(
+            'posts:post_detail', kwargs={'post_id': pick(self.post_ids)}))
+        yield 'post_create', lambda: reader.post(
+            reverse('posts:post_create'),
+            {'text': 'Пост из бенчмарка', 'group': pick(self.groups).pk},
+        )
+
+    def measure(self, scenario):
+        """Задержки, запросы к БД и пик памяти одной страницы."""
+        cache.clear()
+        for _ in range(self.options['warmup']):
+            scenario()
+
+        timings = []
+        queries = []
+        for _ in range(self.options['requests']):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = scenario()
+                timings.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{response.status_code} в ответ на '
+                    f'{response.request["PATH_INFO"]}')
+            queries.append(len(captured))
+
+        # tracemalloc замедляет запросы, поэтому память меряем отдельно
+        tracemalloc.start()
+        scenario()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return {
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 95) * 1000, 3),
+            'queries': round(sum(queries) / len(queries), 2),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def print_table(self, results):
+        self.stdout.write(
+            f'{"страница":<16}{"p50, мс":>10}{"p95, мс":>10}'
+            f'{"запросов":>10}{"память, КБ":>12}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<16}{result["p50_ms"]:>10}{result["p95_ms"]:>10}'
+                f'{result["queries"]:>10}{result["peak_memory_kb"]:>12}'
+            )
+
+    def compare(self, results, path):
+        with open(path) as source:
+            baseline = json.load(source)['results']
+        limit = 1 + self.options['tolerance']
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if result['p95_ms'] > base['p95_ms'] * limit:
+                regressions.append(
+                    f'{name}: p95 {base["p95_ms"]} → {result["p95_ms"]} мс')
+            if result['queries'] > base['queries']:
+                regressions.append(
+                    f'{name}: запросов {base["queries"]} → '
+                    f'{result["queries"]}')
+        if regressions:
+            raise CommandError(
+                'Регрессия производительности:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
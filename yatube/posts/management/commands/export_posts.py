@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, export_lines
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты в JSONL или CSV пачками по pk, '
+        'не загружая таблицу в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл для выгрузки, "-" — писать в stdout',
+        )
+        parser.add_argument(
+            '--format', choices=tuple(FORMATS), default='jsonl',
+            help='Формат выгрузки',
+        )
+        parser.add_argument('--author', help='Только посты автора')
+        parser.add_argument('--group', help='Только посты группы (slug)')
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Постов в одном запросе',
+        )
+
+    def handle(self, *args, **options):
+        self.format = options['format']
+        posts = Post.objects.all()
+        if options['author']:
+            posts = posts.filter(author__username=options['author'])
+        if options['group']:
+            posts = posts.filter(group__slug=options['group'])
+
+        lines = export_lines(posts, options['format'], options['chunk_size'])
+        path = options['path']
+        if path == '-':
+            count = self.write(lines, self.stdout, ending='')
+            # Отчёт не смешиваем с выгрузкой в stdout
+            self.stderr.write(f'Выгружено постов: {count}')
+            return
+        try:
+            with open(path, 'w', encoding='utf-8', newline='') as output:
+                count = self.write(lines, output)
+        except OSError as error:
+            raise CommandError(f'Не удалось записать {path}: {error}')
+        self.stdout.write(self.style.SUCCESS(f'Выгружено постов: {count}'))
+
+    def write(self, lines, output, **kwargs):
+        count = 0
+        for line in lines:
+            output.write(line, **kwargs)
+            count += 1
+        # Заголовок CSV — не пост
+        return count - 1 if self.format == 'csv' else count
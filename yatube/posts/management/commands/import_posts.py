@@ -0,0 +1,209 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.db.models import AutoField
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.models import Group, Post, PostCounter
+from posts.page_cache import purge_feed_pages
+from posts.paginators import change_cached_counts
+from posts.tasks import fan_out_imported
+
+User = get_user_model()
+
+
+def insert_posts(posts, batch_size, using=None):
+    """
+    bulk_create, который сохраняет pub_date и updated из файла.
+
+    bulk_create проставил бы их текущим временем (auto_now_add и
+    auto_now), а вставка с raw=True, как у loaddata, пишет значения
+    полей как есть и не трогает настройки полей модели.
+    """
+    connection = connections[using or router.db_for_write(Post)]
+    fields = [
+        field for field in Post._meta.concrete_fields
+        if not isinstance(field, AutoField)
+    ]
+    batch_size = min(
+        batch_size, max(connection.ops.bulk_batch_size(fields, posts), 1))
+    for start in range(0, len(posts), batch_size):
+        Post.objects.using(connection.alias)._insert(
+            posts[start:start + batch_size], fields=fields, raw=True)
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL или CSV (файл или stdin). '
+        'Поля: text, author (username), group (slug), pub_date (ISO 8601).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл с постами, "-" — читать stdin',
+        )
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат входа, по умолчанию по расширению файла',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Строк в одном INSERT',
+        )
+        parser.add_argument(
+            '--batches-per-transaction', type=int, default=10,
+            help='Сколько INSERT выполнять в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl')
+        self.batch_size = options['batch_size']
+        self.chunk_size = self.batch_size * options['batches_per_transaction']
+        if self.batch_size < 1 or self.chunk_size < 1:
+            raise CommandError('Размеры пачек должны быть положительными')
+
+        self.authors = {}
+        self.groups = {}
+        self.fan_out = set()
+        self.imported = self.skipped = 0
+        self.started = time.monotonic()
+
+        try:
+            stream = sys.stdin if path == '-' else open(
+                path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {path}: {error}')
+        try:
+            records = self.read(stream, fmt)
+            while True:
+                chunk = list(islice(records, self.chunk_size))
+                if not chunk:
+                    break
+                self.import_chunk(chunk)
+                self.report()
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        # Ленты подписчиков раскладываются один раз на весь импорт
+        # и в фоне: каждая пачка повторно писала бы те же посты
+        if self.fan_out:
+            fan_out_imported.delay(sorted(self.fan_out))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: импортировано {self.imported}, '
+            f'пропущено {self.skipped}'
+        ))
+
+    def read(self, stream, fmt):
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                self.warn(f'строка {number}: некорректный JSON')
+                continue
+            if not isinstance(row, dict):
+                self.warn(f'строка {number}: ожидался объект JSON')
+                continue
+            yield row
+
+    def warn(self, message):
+        self.skipped += 1
+        self.stderr.write(f'Пропуск, {message}')
+
+    def resolve(self, chunk):
+        """Дополнить словари авторов и групп одним запросом на пачку."""
+        usernames = {row.get('author') for row in chunk} - set(self.authors)
+        slugs = {row.get('group') for row in chunk} - set(self.groups)
+        usernames.discard(None)
+        slugs.discard(None)
+        slugs.discard('')
+        if usernames:
+            self.authors.update(User.objects.filter(
+                username__in=usernames).values_list('username', 'pk'))
+        if slugs:
+            self.groups.update(Group.objects.filter(
+                slug__in=slugs).values_list('slug', 'pk'))
+
+    def build(self, row):
+        author_id = self.authors.get(row.get('author'))
+        if author_id is None:
+            self.warn(f'неизвестный автор {row.get("author")!r}')
+            return None
+        slug = row.get('group') or None
+        group_id = self.groups.get(slug) if slug else None
+        if slug and group_id is None:
+            self.warn(f'неизвестная группа {slug!r}')
+            return None
+        if not row.get('text'):
+            self.warn('пустой текст')
+            return None
+        pub_date = self.now
+        if row.get('pub_date'):
+            try:
+                pub_date = parse_datetime(row['pub_date'])
+            except ValueError:
+                pub_date = None
+            if pub_date is None:
+                self.warn(f'некорректная дата {row["pub_date"]!r}')
+                return None
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+        post = Post(
+            text=row['text'], author_id=author_id, group_id=group_id)
+        post.pub_date = post.updated = pub_date
+        # Вставка не вызывает save(), готовые колонки заполняются здесь
+        post.render_text()
+        return post
+
+    def import_chunk(self, chunk):
+        self.resolve(chunk)
+        self.now = timezone.now()
+        posts = [post for post in map(self.build, chunk) if post]
+        authors, groups = {}, {}
+        for post in posts:
+            authors[post.author_id] = authors.get(post.author_id, 0) + 1
+            if post.group_id:
+                groups[post.group_id] = groups.get(post.group_id, 0) + 1
+
+        with transaction.atomic():
+            insert_posts(posts, self.batch_size)
+            # Вставка не шлёт сигналы, поэтому счётчики
+            # обновляются один раз на пачку
+            for author_id, count in authors.items():
+                PostCounter.change(author_id, count)
+        self.imported += len(posts)
+
+        scopes = {'index': len(posts)}
+        scopes.update(
+            (f'author:{author_id}', count)
+            for author_id, count in authors.items())
+        scopes.update(
+            (f'group:{group_id}', count) for group_id, count in groups.items())
+        # Кешированные количества и страницы правятся после коммита
+        for scope, count in scopes.items():
+            change_cached_counts([scope], count)
+        purge_feed_pages(scopes)
+        self.fan_out.update(authors)
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.imported / elapsed if elapsed else 0
+        self.stdout.write(
+            f'Импортировано {self.imported} постов '
+            f'за {elapsed:.1f} с ({rate:.0f} постов/с)'
+        )
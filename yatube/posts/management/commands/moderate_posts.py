@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import Group, Post
+from posts.moderation import Moderation
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты в другую группу или удаляет их пачками по pk '
+        'в коротких транзакциях, поправляя счётчики и кеши в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=('move', 'delete'))
+        parser.add_argument('--author', help='Только посты автора')
+        parser.add_argument('--group', help='Только посты группы (slug)')
+        target = parser.add_mutually_exclusive_group()
+        target.add_argument(
+            '--to-group', help='Группа (slug), куда перенести посты')
+        target.add_argument(
+            '--ungroup', action='store_true',
+            help='Убрать посты из групп',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Постов в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        if not options['author'] and not options['group']:
+            raise CommandError('Укажите --author или --group')
+        if options['action'] == 'move':
+            group = self.target_group(options)
+        posts = Post.objects.all()
+        if options['author']:
+            posts = posts.filter(author__username=options['author'])
+        if options['group']:
+            posts = posts.filter(group__slug=options['group'])
+
+        total = posts.count()
+        started = time.monotonic()
+
+        def progress(done):
+            self.stdout.write(f'Обработано {done} из {total}')
+
+        moderation = Moderation(options['chunk_size'], progress)
+        if options['action'] == 'delete':
+            done = moderation.delete(posts)
+            verb = 'Удалено'
+        else:
+            done = moderation.move(posts, group)
+            verb = 'Перенесено'
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} постов: {done} за {elapsed:.1f} с'))
+
+    def target_group(self, options):
+        if options['ungroup']:
+            return None
+        if not options['to_group']:
+            raise CommandError('Для move укажите --to-group или --ungroup')
+        try:
+            return Group.objects.get(slug=options['to_group'])
+        except Group.DoesNotExist:
+            raise CommandError(f'Группа {options["to_group"]} не найдена')
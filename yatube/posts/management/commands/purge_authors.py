@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.purges import pending_purges, purge_author
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет посты отключённых авторов пачками, затем самих авторов. '
+        'Прерванное удаление продолжается при следующем запуске.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать новых удалений',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Секунд между проверками очереди в режиме --loop',
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Повторить удаления, завершившиеся ошибкой',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Постов в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        retry_failed = options['retry_failed']
+        while True:
+            for purge in pending_purges(retry_failed):
+                self.purge(purge, options['chunk_size'])
+            # Упавшие удаления повторяются только один раз за запуск
+            retry_failed = False
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def purge(self, purge, chunk_size):
+        def progress(purge, done):
+            self.stdout.write(f'{purge.username}: удалено постов {done}')
+
+        try:
+            purged = purge_author(purge, chunk_size, progress)
+        except Exception as error:
+            self.stderr.write(f'{purge.username}: ошибка {error!r}')
+            return
+        if not purged:
+            self.stdout.write(f'{purge.username}: удаляется другим процессом')
+            return
+        self.stdout.write(self.style.SUCCESS(f'{purge.username} удалён'))
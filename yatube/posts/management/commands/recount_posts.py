@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import PostCounter
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов всех авторов'
+
+    def handle(self, *args, **options):
+        PostCounter.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано авторов: {PostCounter.objects.count()}'
+        ))
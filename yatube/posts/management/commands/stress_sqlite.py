@@ -0,0 +1,160 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import (
+    OperationalError, close_old_connections, connection, connections,
+)
+from django.test.utils import override_settings
+
+from core.sqlite import SQLITE_PROFILES
+from posts.management.commands.benchmark import percentile
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает SQLite параллельными писателями и читателями '
+        'в профилях из core/sqlite.py и сравнивает пропускную способность.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+', default=list(SQLITE_PROFILES),
+            choices=list(SQLITE_PROFILES),
+        )
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument(
+            '--posts', type=int, default=1000,
+            help='Постов в базе до начала нагрузки',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Нагрузка рассчитана на SQLite')
+        self.options = options
+        results = {
+            profile: self.run(profile) for profile in options['profiles']
+        }
+
+        self.stdout.write(
+            f'{"профиль":<12}{"записей/с":>11}{"чтений/с":>11}'
+            f'{"p95 записи, мс":>16}{"locked":>8}'
+        )
+        for profile, result in results.items():
+            self.stdout.write(
+                f'{profile:<12}{result["writes"]:>11.1f}'
+                f'{result["reads"]:>11.1f}{result["write_p95_ms"]:>16.1f}'
+                f'{result["locked"]:>8}'
+            )
+
+    def run(self, profile):
+        """Прогон на новой файловой базе с профилем profile."""
+        database = connections.databases[connection.alias]
+        saved = database['TEST'].get('NAME'), database['CONN_MAX_AGE']
+        directory = tempfile.mkdtemp()
+        database['TEST']['NAME'] = os.path.join(directory, 'stress.sqlite3')
+        # Как в settings.py: рабочий профиль держит соединения открытыми
+        database['CONN_MAX_AGE'] = 60 if profile == 'production' else 0
+        try:
+            with override_settings(SQLITE_PROFILE=profile):
+                old_name = connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False)
+                try:
+                    self.seed()
+                    return self.hammer()
+                finally:
+                    connection.creation.destroy_test_db(
+                        old_name, verbosity=0)
+        finally:
+            database['TEST']['NAME'], database['CONN_MAX_AGE'] = saved
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def seed(self):
+        self.authors = [
+            User.objects.create_user(username=f'stress_{i}')
+            for i in range(self.options['writers'])
+        ]
+        Post.objects.bulk_create(
+            (
+                Post(author=self.authors[i % len(self.authors)],
+                     text=f'Пост {i}')
+                for i in range(self.options['posts'])
+            ),
+            batch_size=500,
+        )
+        connection.close()
+
+    def work(self, operation, deadline):
+        """Повторять operation до deadline: (успехи, locked, задержки)."""
+        latency = []
+        done = locked = 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                operation()
+                done += 1
+                latency.append(time.perf_counter() - started)
+            except OperationalError:
+                locked += 1
+            finally:
+                # Граница запроса: без CONN_MAX_AGE соединение
+                # закрывается, и следующее открывается заново
+                close_old_connections()
+        connection.close()
+        return done, locked, latency
+
+    def hammer(self):
+        """Писатели создают посты, читатели листают главную."""
+        deadline = time.monotonic() + self.options['seconds']
+        lock = threading.Lock()
+        stats = {'writes': 0, 'reads': 0, 'locked': 0, 'latency': []}
+
+        def writer(author):
+            def write():
+                Post.objects.create(author=author, text='Нагрузочный пост')
+            done, locked, latency = self.work(write, deadline)
+            with lock:
+                stats['writes'] += done
+                stats['locked'] += locked
+                stats['latency'] += latency
+
+        def reader():
+            def read():
+                list(Post.objects.select_related('author', 'group')[:10])
+            done, locked, _ = self.work(read, deadline)
+            with lock:
+                stats['reads'] += done
+                stats['locked'] += locked
+
+        threads = [
+            threading.Thread(target=writer, args=(author,))
+            for author in self.authors
+        ] + [
+            threading.Thread(target=reader)
+            for _ in range(self.options['readers'])
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        return {
+            'writes': stats['writes'] / elapsed,
+            'reads': stats['reads'] / elapsed,
+            'locked': stats['locked'],
+            'write_p95_ms': (
+                percentile(stats['latency'], 95) * 1000
+                if stats['latency'] else 0
+            ),
+        }
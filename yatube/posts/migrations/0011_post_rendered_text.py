@@ -0,0 +1,54 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:23
+
+from django.db import migrations, models
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 300
+CHUNK_SIZE = 1000
+
+
+def render_post_texts(apps, schema_editor):
+    # Копия Post.render_text: исторические модели не знают её методов
+    Post = apps.get_model('posts', 'Post')
+    last = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last).order_by('pk')
+            .only('pk', 'text')[:CHUNK_SIZE]
+        )
+        if not posts:
+            return
+        for post in posts:
+            post.excerpt = Truncator(post.text).chars(EXCERPT_LENGTH)
+            post.excerpt_html = linebreaks(post.excerpt, autoescape=True)
+            post.text_html = linebreaks(post.text, autoescape=True)
+        Post.objects.bulk_update(
+            posts, ['excerpt', 'excerpt_html', 'text_html'])
+        last = posts[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_author_purge'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_post_texts, migrations.RunPython.noop),
+    ]
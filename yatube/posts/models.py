@@ -1,8 +1,14 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
 
 User = get_user_model()
 
+# Длина анонса поста в лентах, символов
+EXCERPT_LENGTH = 300
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
@@ -16,16 +22,45 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def with_details(self):
+        """
+        Посты с автором, группой и количеством постов автора.
+
+        Количество берётся из PostCounter тем же запросом
+        и доступно как author_posts_count.
+        """
+        return self.select_related('author', 'group').annotate(
+            author_posts_count=Coalesce(
+                'author__post_counter__posts_count', 0),
+        )
+
+    def for_list(self):
+        """
+        Посты для лент без полного текста.
+
+        Строки лент выводят готовый анонс, поэтому текст и его HTML
+        не читаются из базы.
+        """
+        return self.defer('text', 'text_html')
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст поста',
         help_text='Текст нового поста'
     )
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+    # Отдельные индексы по FK не нужны: их покрывают составные индексы
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='posts'
+        related_name='posts',
+        db_index=False,
     )
     group = models.ForeignKey(
         Group,
@@ -33,12 +68,250 @@ class Post(models.Model):
         related_name='posts',
         blank=True,
         null=True,
+        db_index=False,
         verbose_name='Группа',
         help_text='Группа, к которой будет относиться пост',
     )
 
+    # Заполняются из text при сохранении, см. render_text
+    excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+    )
+    excerpt_html = models.TextField(blank=True, editable=False)
+    text_html = models.TextField(blank=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
-        return self.text[:15]
+        # Анонс, чтобы не загружать отложенный текст
+        return (self.excerpt or self.text)[:15]
+
+    def render_text(self):
+        """Заполнить анонс и HTML-версии текста для шаблонов."""
+        self.excerpt = Truncator(self.text).chars(EXCERPT_LENGTH)
+        self.excerpt_html = linebreaks(self.excerpt, autoescape=True)
+        self.text_html = linebreaks(self.text, autoescape=True)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            if 'text' not in self.get_deferred_fields():
+                self.render_text()
+        elif 'text' in update_fields:
+            self.render_text()
+            kwargs['update_fields'] = {
+                *update_fields, 'excerpt', 'excerpt_html', 'text_html'}
+        # Счётчик постов автора обновляется в post_save,
+        # поэтому сохраняем пост и счётчик в одной транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     class Meta:
         ordering = ['-pub_date', ]
+        # Индексы повторяют запросы лент: фильтр по автору или группе
+        # и сортировка по (pub_date, id), в том числе для keyset-паджинации
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='posts_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='posts_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='posts_pub_date_id_idx',
+            ),
+            # MAX(updated) главной ленты для условных GET
+            models.Index(fields=['updated'], name='posts_updated_idx'),
+        ]
+
+
+class PostCounter(models.Model):
+    """Денормализованное количество постов автора."""
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов',
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+    @staticmethod
+    def for_author(author):
+        """Количество постов автора без запроса COUNT."""
+        counter = getattr(author, 'post_counter', None)
+        return counter.posts_count if counter else 0
+
+    @classmethod
+    def change(cls, author_id, delta):
+        """Изменить счётчик автора на delta."""
+        updated = cls.objects.filter(author_id=author_id).update(
+            posts_count=models.F('posts_count') + delta
+        )
+        # Строки счётчика нет — заводим её только при добавлении поста,
+        # при удалении автора каскадом создавать её заново нельзя.
+        if not updated and delta > 0:
+            cls.objects.create(author_id=author_id, posts_count=delta)
+
+    @classmethod
+    def rebuild(cls):
+        """Пересчитать счётчики всех авторов по таблице постов."""
+        counts = (
+            Post.objects.order_by()
+            .values('author_id')
+            .annotate(total=models.Count('pk'))
+        )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                cls(author_id=row['author_id'], posts_count=row['total'])
+                for row in counts
+            )
+
+
+class Follow(models.Model):
+    """Подписка пользователя на автора."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+    )
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='posts_follow_unique',
+            ),
+        ]
+
+
+class FollowerCounter(models.Model):
+    """Денормализованное количество подписчиков автора."""
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='follower_counter',
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков',
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.followers_count}'
+
+    @classmethod
+    def change(cls, author_id, delta):
+        """Изменить счётчик автора на delta."""
+        updated = cls.objects.filter(author_id=author_id).update(
+            followers_count=models.F('followers_count') + delta
+        )
+        if not updated and delta > 0:
+            cls.objects.create(author_id=author_id, followers_count=delta)
+
+
+class TimelineEntry(models.Model):
+    """
+    Пост в ленте подписок пользователя.
+
+    Записи создаются при публикации поста (fan-out on write),
+    pub_date копируется из поста, чтобы лента читалась одним
+    проходом по индексу (user, -pub_date, -post).
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_index=False,
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    pub_date = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.user}: {self.post_id}'
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='posts_timeline_user_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='posts_timeline_unique',
+            ),
+        ]
+
+
+class AuthorPurge(models.Model):
+    """
+    Отложенное удаление автора.
+
+    Автор отключается сразу, а его посты удаляются пачками фоновой
+    задачей purge_deleted_author или командой purge_authors. Каждая
+    пачка коммитится отдельно, поэтому прерванное удаление
+    продолжается с того места, где остановилось.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Завершено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    # Запись остаётся после удаления автора как история
+    author = models.OneToOneField(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='purge',
+    )
+    username = models.CharField(max_length=150, verbose_name='Автор')
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        db_index=True,
+        verbose_name='Статус',
+    )
+    posts_deleted = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Удалено постов',
+    )
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.username}: {self.get_status_display()}'
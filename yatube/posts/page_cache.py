@@ -0,0 +1,98 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.replicas import primary_reads
+
+PAGE_KEY = 'posts:page:{}:{}'
+VERSION_KEY = 'posts:page-version:{}'
+
+
+def _page_key(request):
+    """Ключ страницы для анонимного GET или None, если кешировать нельзя."""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    if request.user.is_authenticated or set(request.GET) - {'page'}:
+        return None
+    page = request.GET.get('page', '1')
+    cached_pages = map(str, range(1, settings.POSTS_PAGE_CACHE_PAGES + 1))
+    if page not in cached_pages:
+        return None
+    return PAGE_KEY.format(request.path, page)
+
+
+def _cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+def purge_feed_pages(scopes):
+    """Сбросить закешированные страницы лент."""
+    for scope in scopes:
+        try:
+            cache.incr(VERSION_KEY.format(scope))
+        except ValueError:
+            # Версии нет — старые страницы с ней и так не совпадут
+            pass
+
+
+def scope_version(scope):
+    """Текущая версия ленты, недостающая заводится заново."""
+    version_key = VERSION_KEY.format(scope)
+    cache.add(version_key, 1, None)
+    return cache.get(version_key)
+
+
+def set_feed_scope(request, scope):
+    """
+    Запомнить ленту страницы для кеша страниц.
+
+    Версия ленты читается здесь, до запроса постов: пост, закоммиченный
+    во время рендера, увеличит версию, и устаревшая страница сохранится
+    уже под старой.
+    """
+    request.feed_scope = scope
+    if scope and getattr(request, 'page_cache_key', None):
+        request.feed_version = scope_version(scope)
+
+
+def anonymous_page_cache(view_func):
+    """
+    Кеширует первые страницы ленты целиком для анонимных читателей.
+
+    Страница хранится по пути и номеру вместе с версией своей ленты
+    (request.feed_scope и feed_version выставляет paginate). Сигналы Post
+    увеличивают версию ленты, и её страницы перестают совпадать.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = _page_key(request)
+        if key is None:
+            return view_func(request, *args, **kwargs)
+
+        entry = cache.get(key)
+        if entry:
+            scope, version, response = entry
+            if cache.get(VERSION_KEY.format(scope)) == version:
+                return response
+
+        request.page_cache_key = key
+        # Страница достанется всем читателям до следующей версии ленты,
+        # поэтому рендерится по основной базе, а не по отстающей реплике
+        with primary_reads():
+            response = view_func(request, *args, **kwargs)
+        scope = getattr(request, 'feed_scope', None)
+        version = getattr(request, 'feed_version', None)
+        if scope and version and _cacheable(request, response):
+            cache.set(
+                key,
+                (scope, version, response),
+                settings.POSTS_PAGE_CACHE_TIMEOUT,
+            )
+        return response
+    return wrapper
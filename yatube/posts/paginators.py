@@ -0,0 +1,222 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import Q
+from django.utils.encoding import force_bytes, force_str
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .page_cache import set_feed_scope
+
+
+def encode_cursor(post):
+    """Непрозрачный токен позиции поста в ленте."""
+    raw = f'{post.pub_date.isoformat()}|{post.pk}'
+    return urlsafe_base64_encode(force_bytes(raw))
+
+
+def decode_cursor(token):
+    """Разобрать токен в пару (pub_date, id) или вернуть None."""
+    try:
+        pub_date, pk = force_str(urlsafe_base64_decode(token)).split('|')
+        return datetime.fromisoformat(pub_date), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+
+class CursorPage(Page):
+    """Страница ленты, построенная по курсору, а не по номеру."""
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} posts>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return encode_cursor(self.object_list[0])
+
+    def next_page_number(self):
+        # У страницы по курсору нет номеров, ссылки строятся по курсорам
+        return None
+
+    def previous_page_number(self):
+        return None
+
+
+class CursorPaginator(Paginator):
+    """
+    Keyset-паджинатор по (pub_date, id).
+
+    Вместо OFFSET и COUNT(*) берёт per_page + 1 строк после
+    или до курсора, поэтому любая страница стоит как первая.
+    """
+
+    def __init__(self, object_list, per_page, after=None, before=None):
+        super().__init__(object_list, per_page)
+        self.after = decode_cursor(after) if after else None
+        self.before = decode_cursor(before) if before else None
+
+    def get_page(self, number=None):
+        return self.page()
+
+    def page(self, number=None):
+        posts = self.object_list
+        if self.before:
+            pub_date, pk = self.before
+            rows = list(
+                posts.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+                ).order_by('pub_date', 'pk')[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return CursorPage(rows, self, True, has_previous)
+
+        posts = posts.order_by('-pub_date', '-pk')
+        if self.after:
+            pub_date, pk = self.after
+            posts = posts.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        rows = list(posts[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return CursorPage(
+            rows[:self.per_page], self, has_next, self.after is not None
+        )
+
+
+def count_cache_key(scope):
+    """Ключ кеша с количеством постов ленты."""
+    return f'posts:count:{scope}'
+
+
+def feed_scopes(post):
+    """Ленты, в которых виден пост."""
+    scopes = ['index', f'author:{post.author_id}']
+    if post.group_id:
+        scopes.append(f'group:{post.group_id}')
+    return scopes
+
+
+def change_cached_counts(scopes, delta):
+    """Поправить закешированные количества постов на delta."""
+    for scope in scopes:
+        try:
+            cache.incr(count_cache_key(scope), delta)
+        except ValueError:
+            # Количества нет в кеше — его посчитает следующий запрос
+            pass
+
+
+class ApproximatePage(Page):
+    """Страница, про следующую за которой известно по лишней строке."""
+    is_approximate = True
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Паджинатор, который берёт количество постов ленты из кеша.
+
+    Сигналы Post правят закешированное значение на месте, а таймаут
+    POSTS_COUNT_CACHE_TIMEOUT страхует от расхождений между процессами.
+    При POSTS_COUNT_APPROXIMATE_LIMIT COUNT(*) ограничивается этим
+    числом строк. Такое количество — нижняя граница: номера страниц
+    за ней не обрезаются, а о следующей странице говорит лишняя строка.
+    """
+
+    def __init__(self, object_list, per_page, scope, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+
+    @cached_property
+    def limit(self):
+        return getattr(settings, 'POSTS_COUNT_APPROXIMATE_LIMIT', None)
+
+    @cached_property
+    def count(self):
+        key = count_cache_key(self.scope)
+        count = cache.get(key)
+        if count is None:
+            if self.limit:
+                count = self.object_list[:self.limit].count()
+            else:
+                count = super().count
+            cache.set(key, count, settings.POSTS_COUNT_CACHE_TIMEOUT)
+        return count
+
+    @cached_property
+    def approximate(self):
+        return bool(self.limit) and self.count >= self.limit
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.approximate or int(number) < 1:
+                raise
+            return int(number)
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            # Номер за концом ленты, которого не видно по количеству
+            return self.page(self.num_pages)
+
+    def page(self, number):
+        # Не обрезаем страницу по количеству: оно может отставать
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if not self.approximate:
+            return self._get_page(self.object_list[bottom:top], number, self)
+        rows = list(self.object_list[bottom:top + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return ApproximatePage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+
+def paginate(request, posts, per_page, scope=None):
+    """Вернуть page_obj для ленты постов."""
+    # Лента страницы нужна кешу страниц, см. page_cache.py
+    set_feed_scope(request, scope)
+    if getattr(settings, 'POSTS_CURSOR_PAGINATION', False):
+        paginator = CursorPaginator(
+            posts,
+            per_page,
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+        return paginator.get_page()
+    if scope:
+        paginator = CachedCountPaginator(posts, per_page, scope)
+    else:
+        paginator = Paginator(posts, per_page)
+    return paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,133 @@
+"""
+Удаление авторов без каскада по всем постам в одной транзакции.
+
+disable_authors отключает учётные записи сразу, заводит AuthorPurge
+и ставит удаление в очередь задач. purge_author удаляет пачками посты
+через Moderation, затем подписки и ленту пользователя, и только потом
+его самого, когда сборщику удаления уже нечего загружать.
+
+Этим путём идёт только удаление из админки и команды purge_authors.
+Прямой User.delete() в коде по-прежнему удаляет всё каскадом в одной
+транзакции, поэтому для авторов с большим числом постов нужно звать
+disable_authors.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .lookups import users as user_lookups
+from .models import (AuthorPurge, Follow, FollowerCounter, Post,
+                     TimelineEntry)
+from .moderation import Moderation, pk_chunks
+
+User = get_user_model()
+
+
+def disable_authors(users):
+    """Отключить пользователей и поставить их удаление в очередь."""
+    # Задача импортирует этот модуль
+    from .tasks import purge_deleted_author
+
+    with transaction.atomic():
+        for user in users:
+            User.objects.filter(pk=user.pk).update(is_active=False)
+            purge, _ = AuthorPurge.objects.update_or_create(
+                author_id=user.pk,
+                defaults={'username': user.username,
+                          'status': AuthorPurge.PENDING},
+            )
+            purge_deleted_author.delay(purge.pk)
+        # update() не шлёт сигналов, а профиль читается из кеша
+        usernames = [user.username for user in users]
+        transaction.on_commit(lambda: user_lookups.invalidate(*usernames))
+
+
+def pending_purges(retry_failed=False):
+    """
+    Незавершённые удаления, которые можно забрать.
+
+    Выполняющееся удаление попадает сюда, только если оно не двигалось
+    POSTS_PURGE_LEASE_TIMEOUT секунд: его процесс, видимо, упал.
+    """
+    statuses = [AuthorPurge.PENDING]
+    if retry_failed:
+        statuses.append(AuthorPurge.FAILED)
+    expired = timezone.now() - timedelta(
+        seconds=settings.POSTS_PURGE_LEASE_TIMEOUT)
+    return AuthorPurge.objects.filter(
+        Q(status__in=statuses)
+        | Q(status=AuthorPurge.RUNNING, updated__lt=expired)
+    ).order_by('pk')
+
+
+def claim_purge(purge):
+    """
+    Забрать удаление себе; False, если его уже выполняет другой процесс.
+
+    Как и core.jobs.claim, условный UPDATE достаётся только одному
+    из процессов: после него строка уже не подходит под условие.
+    """
+    return bool(pending_purges(retry_failed=True).filter(pk=purge.pk).update(
+        status=AuthorPurge.RUNNING, error='', updated=timezone.now()))
+
+
+def purge_rows(queryset, chunk_size, before_delete=None):
+    """Удалить строки пачками, без сборщика удаления и сигналов."""
+    model = queryset.model
+    for pks in pk_chunks(queryset, chunk_size):
+        rows = model.objects.filter(pk__in=pks)
+        with transaction.atomic():
+            if before_delete:
+                before_delete(rows)
+            rows._raw_delete(rows.db)
+
+
+def _unfollow(follows):
+    # Сигнал отписки тратил бы по два запроса на строку
+    authors = Counter(follows.values_list('author_id', flat=True))
+    for author_id, count in authors.items():
+        FollowerCounter.change(author_id, -count)
+
+
+def purge_author(purge, chunk_size=None, progress=None):
+    """
+    Удалить пачками посты, подписки и ленту автора, затем его самого.
+
+    Возвращает False, не трогая данных, если удаление уже выполняется.
+    """
+    if not claim_purge(purge):
+        return False
+    purges = AuthorPurge.objects.filter(pk=purge.pk)
+
+    def chunk_done(done):
+        # Прогресс пишется после коммита каждой пачки
+        purges.update(posts_deleted=purge.posts_deleted + done,
+                      updated=timezone.now())
+        if progress:
+            progress(purge, done)
+
+    try:
+        moderation = Moderation(chunk_size, chunk_done)
+        moderation.delete(Post.objects.filter(author_id=purge.author_id))
+        # Посты автора ушли из чужих лент вместе с ними, остаются
+        # подписки в обе стороны и собственная лента пользователя
+        purge_rows(Follow.objects.filter(user_id=purge.author_id),
+                   moderation.chunk_size, _unfollow)
+        purge_rows(Follow.objects.filter(author_id=purge.author_id),
+                   moderation.chunk_size)
+        purge_rows(TimelineEntry.objects.filter(user_id=purge.author_id),
+                   moderation.chunk_size)
+        with transaction.atomic():
+            User.objects.filter(pk=purge.author_id).delete()
+    except Exception as error:
+        purges.update(status=AuthorPurge.FAILED, error=repr(error),
+                      updated=timezone.now())
+        raise
+    purges.update(status=AuthorPurge.DONE, finished=timezone.now(),
+                  updated=timezone.now())
+    return True
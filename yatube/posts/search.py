@@ -0,0 +1,159 @@
+from django.db import connection
+from django.utils.functional import cached_property
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+
+# Таблица FTS5 хранит только индекс, сам текст читается из posts_post
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "text, content='posts_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+
+FTS_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS posts_post_fts_insert "
+    f"AFTER INSERT ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS posts_post_fts_delete "
+    f"AFTER DELETE ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS posts_post_fts_update "
+    f"AFTER UPDATE OF text ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+)
+
+# Управляющие символы вокруг совпадений: их нет в тексте постов,
+# поэтому сниппет можно экранировать и только потом подсветить
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def fts_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def ensure_search_index(using=connection):
+    """Создать таблицу FTS5 и триггеры, если их нет."""
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(FTS_SCHEMA)
+        for trigger in FTS_TRIGGERS:
+            cursor.execute(trigger)
+
+
+def restore_search_triggers(using=connection):
+    """
+    Вернуть триггеры, если таблица FTS5 уже создана миграцией.
+
+    Миграции SQLite пересоздают posts_post при изменении полей,
+    и триггеры пропадают вместе со старой таблицей.
+    """
+    if not fts_available(using):
+        return
+    if FTS_TABLE in using.introspection.table_names():
+        ensure_search_index(using)
+
+
+def rebuild_search_index(using=connection):
+    """Переиндексировать все посты."""
+    ensure_search_index(using)
+    if fts_available(using):
+        with using.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def match_expression(query):
+    """Запрос пользователя в виде безопасного выражения MATCH."""
+    terms = [
+        term.replace('"', '""') for term in query.split() if term.strip('"')
+    ]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def highlight(snippet):
+    """Экранировать сниппет и подсветить совпадения."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+class PostSearch:
+    """
+    Результаты поиска по тексту постов, отсортированные по bm25.
+
+    Поддерживает count() и срезы, поэтому отдаётся Paginator как есть:
+    каждая страница — один запрос к FTS5 и один за самими постами.
+    """
+
+    def __init__(self, query):
+        self.match = match_expression(query)
+
+    @cached_property
+    def _count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                [self.match],
+            )
+            return cursor.fetchone()[0]
+
+    def count(self):
+        return self._count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        if not self.match:
+            return []
+        offset = item.start or 0
+        limit = (item.stop or self._count) - offset
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, snippet({FTS_TABLE}, 0, %s, %s, '…', 16) "
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}) LIMIT %s OFFSET %s',
+                [MARK_START, MARK_END, self.match, limit, offset],
+            )
+            rows = cursor.fetchall()
+        posts = Post.objects.select_related(
+            'author__post_counter', 'group'
+        ).in_bulk([post_id for post_id, _ in rows])
+        results = []
+        for post_id, snippet in rows:
+            post = posts.get(post_id)
+            if post is not None:
+                post.snippet = highlight(snippet)
+                results.append(post)
+        return results
+
+
+def search_posts(queryset, query):
+    """Отфильтровать queryset постов по полнотекстовому запросу."""
+    match = match_expression(query)
+    if not match:
+        return queryset.none()
+    # RawSQL внутри __in попадает в двойные скобки, и SQLite сравнивает
+    # id только с первой строкой подзапроса, поэтому условие через extra
+    return queryset.extra(
+        where=[
+            f'"posts_post"."id" IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)'
+        ],
+        params=[match],
+    )
@@ -0,0 +1,222 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .fragments import (invalidate_author_fragments,
+                        invalidate_group_fragments, invalidate_post_fragments)
+from .lookups import groups, users
+from .models import Follow, FollowerCounter, Group, Post, PostCounter
+from .page_cache import purge_feed_pages
+from .paginators import change_cached_counts, feed_scopes
+from .timeline import backfill_timeline, drop_author_from_timeline
+
+User = get_user_model()
+
+
+def _is_login(update_fields):
+    # Вход пользователя сохраняет только last_login
+    return bool(update_fields) and set(update_fields) == {'last_login'}
+
+
+@receiver(post_save, sender=Post)
+def increase_post_counter(sender, instance, created, **kwargs):
+    """Новый пост увеличивает счётчик автора."""
+    if created:
+        PostCounter.change(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def decrease_post_counter(sender, instance, **kwargs):
+    """Удалённый пост уменьшает счётчик автора."""
+    PostCounter.change(instance.author_id, -1)
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_group(sender, instance, **kwargs):
+    """Запомнить прежнюю группу редактируемого поста."""
+    if not instance._state.adding:
+        instance._old_group_id = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('group_id', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    """Поправить закешированные количества постов в лентах."""
+    if created:
+        scopes, delta = feed_scopes(instance), 1
+    else:
+        old_group_id = getattr(instance, '_old_group_id', None)
+        if old_group_id == instance.group_id:
+            return
+        if old_group_id:
+            transaction.on_commit(
+                lambda: change_cached_counts([f'group:{old_group_id}'], -1)
+            )
+        if not instance.group_id:
+            return
+        scopes, delta = [f'group:{instance.group_id}'], 1
+    transaction.on_commit(lambda: change_cached_counts(scopes, delta))
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    """Удалённый пост уменьшает закешированные количества."""
+    scopes = feed_scopes(instance)
+    transaction.on_commit(lambda: change_cached_counts(scopes, -1))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def drop_post_fragment(sender, instance, **kwargs):
+    """Изменённый или удалённый пост сбрасывает свой фрагмент."""
+    post_id = instance.pk
+    transaction.on_commit(lambda: invalidate_post_fragments([post_id]))
+
+
+@receiver(post_save, sender=User)
+def drop_author_fragments(sender, instance, created, update_fields,
+                          **kwargs):
+    """Изменение профиля автора сбрасывает фрагменты и ленты его постов."""
+    if created or _is_login(update_fields):
+        return
+    if not instance.posts.exists():
+        return
+    # Строки сбрасываются версией автора, а из постов нужны только
+    # их группы, чтобы сбросить страницы этих лент
+    group_ids = (
+        instance.posts.exclude(group=None).order_by()
+        .values_list('group_id', flat=True).distinct()
+    )
+    author_id = instance.pk
+    scopes = ['index', f'author:{author_id}'] + [
+        f'group:{group_id}' for group_id in group_ids]
+
+    def invalidate():
+        invalidate_author_fragments(author_id)
+        purge_feed_pages(scopes)
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_feeds(sender, instance, **kwargs):
+    """Сбросить закешированные страницы лент, где виден пост."""
+    scopes = feed_scopes(instance)
+    old_group_id = getattr(instance, '_old_group_id', None)
+    if old_group_id and old_group_id != instance.group_id:
+        scopes.append(f'group:{old_group_id}')
+    # Сбрасываем и сразу, и после коммита: страница, отрендеренная
+    # другим запросом до коммита, не должна пережить транзакцию
+    purge_feed_pages(scopes)
+    transaction.on_commit(lambda: purge_feed_pages(scopes))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def purge_group_feed(sender, instance, **kwargs):
+    """Изменение группы сбрасывает её строки и страницы лент с ними."""
+    # Строка поста ссылается на группу по slug, поэтому устаревают
+    # и главная, и профили авторов группы
+    author_ids = (
+        Post.objects.filter(group=instance).order_by()
+        .values_list('author_id', flat=True).distinct()
+    )
+    scopes = ['index', f'group:{instance.pk}'] + [
+        f'author:{author_id}' for author_id in author_ids]
+    group_id = instance.pk
+
+    def invalidate():
+        invalidate_group_fragments(group_id)
+        purge_feed_pages(scopes)
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def _remember_lookup_value(lookups, instance):
+    # Строку, найденную по прежнему slug или username, тоже надо сбросить
+    if not instance._state.adding:
+        instance._old_lookup_value = (
+            lookups.model._default_manager.filter(pk=instance.pk)
+            .values_list(lookups.field, flat=True).first()
+        )
+
+
+def _invalidate_lookups(lookups, instance):
+    values = {getattr(instance, lookups.field)}
+    old_value = getattr(instance, '_old_lookup_value', None)
+    if old_value:
+        values.add(old_value)
+    # Сразу и после коммита: запрос, прочитавший старую строку
+    # до коммита, не должен оставить её в кеше
+    lookups.invalidate(*values)
+    transaction.on_commit(lambda: lookups.invalidate(*values))
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_slug(sender, instance, **kwargs):
+    """Запомнить прежний slug группы."""
+    _remember_lookup_value(groups, instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_lookups(sender, instance, **kwargs):
+    """Изменение группы сбрасывает её запись в кеше групп по slug."""
+    _invalidate_lookups(groups, instance)
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    """Запомнить прежний username пользователя."""
+    if not _is_login(update_fields):
+        _remember_lookup_value(users, instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_lookups(sender, instance, update_fields=None,
+                            **kwargs):
+    """Изменение пользователя сбрасывает его запись в кеше по username."""
+    if not _is_login(update_fields):
+        _invalidate_lookups(users, instance)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    """Новый пост попадает в ленты подписчиков автора."""
+    # Задачи импортируют модули, которые импортируют этот
+    from .tasks import deliver_post
+
+    # Раскладка по лентам и их подрезка идут в фоне после коммита,
+    # а не в запросе, который держит блокировку записи
+    if created:
+        deliver_post.delay(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def follow_author(sender, instance, created, **kwargs):
+    """Подписка заполняет ленту постами автора."""
+    if created:
+        FollowerCounter.change(instance.author_id, 1)
+        backfill_timeline(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def unfollow_author(sender, instance, **kwargs):
+    """Отписка убирает посты автора из ленты."""
+    # Задачи импортируют модули, которые импортируют этот
+    from .tasks import fan_out_former_celebrity
+
+    FollowerCounter.change(instance.author_id, -1)
+    drop_author_from_timeline(instance.user_id, instance.author_id)
+    followers = FollowerCounter.objects.filter(
+        author_id=instance.author_id,
+    ).values_list('followers_count', flat=True).first()
+    if followers == settings.POSTS_FANOUT_MAX_FOLLOWERS:
+        # Автор только что перестал читаться на лету
+        fan_out_former_celebrity.delay(instance.author_id)
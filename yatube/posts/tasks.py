@@ -0,0 +1,34 @@
+from core.jobs import task
+
+from .models import AuthorPurge, Post
+from .purges import purge_author
+from .timeline import fan_out_author, fan_out_post
+
+
+@task
+def purge_deleted_author(purge_id):
+    """Удалить посты и учётную запись отключённого автора."""
+    purge = AuthorPurge.objects.filter(pk=purge_id).first()
+    if purge and purge.status != AuthorPurge.DONE:
+        purge_author(purge)
+
+
+@task
+def fan_out_former_celebrity(author_id):
+    """Разложить посты автора, опустившегося ниже порога fan-out."""
+    fan_out_author(author_id)
+
+
+@task
+def fan_out_imported(author_ids):
+    """Разложить по лентам последние посты авторов после импорта."""
+    for author_id in author_ids:
+        fan_out_author(author_id)
+
+
+@task
+def deliver_post(post_id):
+    """Разложить новый пост по лентам подписчиков."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post:
+        fan_out_post(post)
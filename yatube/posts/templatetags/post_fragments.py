@@ -0,0 +1,21 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from posts.fragments import render_post_rows
+from posts.paginators import encode_cursor
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_rows(page_obj):
+    """Строки ленты из кеша фрагментов."""
+    return [mark_safe(row) for row in render_post_rows(page_obj)]
+
+
+@register.simple_tag
+def next_rows_url(rows_url, page_obj):
+    """Адрес строк ленты после последнего поста страницы."""
+    if not rows_url or not page_obj.has_next() or not len(page_obj):
+        return ''
+    return f'{rows_url}?after={encode_cursor(page_obj[len(page_obj) - 1])}'
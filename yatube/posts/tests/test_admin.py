@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.admin import PostAdmin
+from posts.models import Group, Post
+
+User = get_user_model()
+
+PER_PAGE = PostAdmin.list_per_page
+
+
+class PostAdminTest(TestCase):
+    """Тестирование списка постов в админке."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        cls.author = User.objects.create_user(username='admin_author')
+        cls.group = Group.objects.create(title='Админка', slug='admin-group')
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group, text=f'Пост {i}')
+            for i in range(PER_PAGE * 2 + 10)
+        )
+        cls.url = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_groups_and_authors_read_once(self):
+        """Группы и авторы строк не читаются по одной."""
+        for i in range(5):
+            author = User.objects.create_user(username=f'author_{i}')
+            group = Group.objects.create(title=f'Группа {i}', slug=f'g-{i}')
+            Post.objects.create(author=author, group=group, text='Новый')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        tables = [query['sql'].split(' FROM ')[1].split()[0]
+                  for query in queries if ' FROM ' in query['sql']]
+        self.assertEqual(tables.count('"posts_group"'), 1)
+        self.assertEqual(tables.count('"auth_user"'), 1)
+        self.assertContains(response, 'Группа 4</option>', PER_PAGE)
+        # Ни DISTINCT по датам, ни MIN/MAX по всей таблице
+        for query in queries:
+            self.assertNotIn('django_datetime_trunc', query['sql'])
+            self.assertNotIn('MIN(', query['sql'])
+
+    def test_keyset_pages_cover_posts_once(self):
+        response = self.client.get(self.url)
+        seen = [post.pk for post in response.context['cl'].result_list]
+        next_url = response.context['cl'].next_url
+        while next_url:
+            response = self.client.get(self.url + next_url)
+            changelist = response.context['cl']
+            self.assertTrue(changelist.keyset_page)
+            seen += [post.pk for post in changelist.result_list]
+            next_url = changelist.next_url
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    @override_settings(POSTS_ADMIN_COUNT_LIMIT=15)
+    def test_filtered_count_is_capped(self):
+        response = self.client.get(
+            self.url, {'group__id__exact': self.group.pk})
+        self.assertEqual(response.context['cl'].result_count, 15)
+        response = self.client.get(self.url)
+        self.assertEqual(
+            response.context['cl'].result_count, Post.objects.count())
@@ -0,0 +1,38 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from posts.management.commands.benchmark import Command, percentile
+
+
+class BenchmarkTest(SimpleTestCase):
+    """Тестирование расчётов команды benchmark без прогона страниц."""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([3], 95), 3)
+
+    def compare(self, results):
+        baseline = {'results': {
+            'index': {'p95_ms': 10, 'queries': 3},
+        }}
+        command = Command(stdout=StringIO())
+        command.options = {'tolerance': 0.2}
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as source:
+            json.dump(baseline, source)
+            source.flush()
+            command.compare(results, source.name)
+
+    def test_compare_within_tolerance(self):
+        self.compare({'index': {'p95_ms': 11.5, 'queries': 3}})
+
+    def test_compare_fails_on_regression(self):
+        with self.assertRaisesMessage(CommandError, 'p95'):
+            self.compare({'index': {'p95_ms': 13, 'queries': 3}})
+        with self.assertRaisesMessage(CommandError, 'запросов'):
+            self.compare({'index': {'p95_ms': 10, 'queries': 4}})
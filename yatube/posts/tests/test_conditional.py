@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TransactionTestCase):
+    """Тестирование ответов 304 для лент и страницы поста."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='etag_author')
+        self.group = Group.objects.create(
+            title='Группа условных запросов',
+            slug='etag-group',
+        )
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Первый пост')
+        self.client = Client()
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def revalidate(self, url):
+        etag = self.client.get(url)['ETag']
+        return etag, self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                _, response = self.revalidate(url)
+                self.assertEqual(response.status_code, 304)
+
+    def test_feed_revalidation_skips_database(self):
+        """Повторная проверка ленты обходится без запросов к базе."""
+        url = self.urls[0]
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        url = self.urls[3]
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(response.status_code, 200)
+
+    def test_feeds_send_only_etag(self):
+        """Удаление старого поста не прячется за If-Modified-Since."""
+        for url in self.urls[:3]:
+            with self.subTest(url=url):
+                self.assertFalse(
+                    self.client.get(url).has_header('Last-Modified'))
+
+    def test_feed_validators_use_cached_count(self):
+        """После записи валидаторы ленты не делают COUNT(*)."""
+        url = self.urls[0]
+        self.client.get(url)
+        Post.objects.create(author=self.author, text='Второй пост')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT', query['sql'])
+
+    def test_new_post_changes_feeds(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        Post.objects.create(
+            author=self.author, group=self.group, text='Второй пост')
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url])
+                # на странице поста виден счётчик постов автора
+                self.assertEqual(response.status_code, 200)
+
+    def test_edit_and_rename_change_etag(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный пост'
+        post.save()
+        for url in self.urls:
+            with self.subTest(url=url, change='edit'):
+                self.assertNotEqual(self.client.get(url)['ETag'], etags[url])
+
+        etag = self.client.get(self.urls[3])['ETag']
+        author = User.objects.get(pk=self.author.pk)
+        author.first_name = 'Новое имя'
+        author.save()
+        self.assertNotEqual(self.client.get(self.urls[3])['ETag'], etag)
+
+    def test_authenticated_without_validators(self):
+        self.client.force_login(self.author)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertFalse(self.client.get(url).has_header('ETag'))
@@ -0,0 +1,89 @@
+import csv
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.export import export_lines
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ExportPostsTest(TestCase):
+    """Тестирование потоковой выгрузки постов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='exporter')
+        cls.other = User.objects.create_user(username='other_exporter')
+        cls.staff = User.objects.create_user(
+            username='staff_exporter', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Группа выгрузки',
+            slug='export-group',
+        )
+        for i in range(5):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}')
+        Post.objects.create(author=cls.other, text='Чужой пост')
+
+    def test_keyset_chunks(self):
+        """Выгрузка идёт короткими запросами по chunk_size постов."""
+        # 6 постов по 2 — три пачки и пустой запрос в конце
+        with self.assertNumQueries(4):
+            lines = list(export_lines(Post.objects.all(), chunk_size=2))
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['author'], 'exporter')
+        self.assertEqual(rows[0]['group'], 'export-group')
+        self.assertEqual(rows[-1]['group'], '')
+
+    def test_csv_header_is_a_string(self):
+        lines = export_lines(Post.objects.none(), 'csv')
+        self.assertEqual(list(lines), ['text,author,group,pub_date\r\n'])
+
+    def test_command_round_trip(self):
+        """Выгрузку можно загрузить обратно командой import_posts."""
+        with tempfile.NamedTemporaryFile(suffix='.csv') as dump:
+            call_command(
+                'export_posts', dump.name, format='csv',
+                author='exporter', stdout=StringIO(),
+            )
+            with open(dump.name, encoding='utf-8') as source:
+                rows = list(csv.DictReader(source))
+            self.assertEqual(len(rows), 5)
+            call_command(
+                'import_posts', dump.name,
+                stdout=StringIO(), stderr=StringIO(),
+            )
+        self.assertEqual(Post.objects.filter(author=self.author).count(), 10)
+
+    def test_stdout(self):
+        out = StringIO()
+        call_command(
+            'export_posts', group='export-group',
+            stdout=out, stderr=StringIO(),
+        )
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
+
+    def test_view_is_staff_only(self):
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(reverse('posts:export_posts'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_view_streams_posts(self):
+        client = Client()
+        client.force_login(self.staff)
+        response = client.get(
+            reverse('posts:export_posts'), {'author': 'other_exporter'})
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['text'] for row in rows], ['Чужой пост'])
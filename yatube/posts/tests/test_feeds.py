@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostsFeedTest(TransactionTestCase):
+    """Тестирование RSS и Atom лент."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='feed_author', first_name='Лев', last_name='Толстой')
+        self.group = Group.objects.create(title='Лента', slug='feed-group')
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Пост в ленте')
+        Post.objects.create(
+            author=User.objects.create_user(username='feed_other'),
+            text='Пост без группы',
+        )
+        self.client = Client()
+        self.urls = {
+            reverse('posts:feed'): 2,
+            reverse('posts:feed_atom'): 2,
+            reverse('posts:group_feed', kwargs={'slug': 'feed-group'}): 1,
+            reverse('posts:group_feed_atom', kwargs={'slug': 'feed-group'}): 1,
+            reverse('posts:profile_feed',
+                    kwargs={'username': 'feed_author'}): 1,
+            reverse('posts:profile_feed_atom',
+                    kwargs={'username': 'feed_author'}): 1,
+        }
+
+    def test_feed_items(self):
+        for url, count in self.urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                content = response.content.decode()
+                self.assertIn('Пост в ленте', content)
+                self.assertEqual(
+                    content.count('<item>') + content.count('<entry>'), count)
+                self.assertIn('Лев Толстой', content)
+
+    def test_cached_until_next_post(self):
+        url = reverse('posts:group_feed', kwargs={'slug': 'feed-group'})
+        etag = self.client.get(url)['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        # Лента и её ETag берутся из кеша без запросов к базе
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        Post.objects.create(
+            author=self.author, group=self.group, text='Новый пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Новый пост')
+
+    def test_cached_feed_keeps_last_modified(self):
+        url = reverse('posts:feed')
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url)
+        self.assertEqual(response['Last-Modified'], last_modified)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Last-Modified'], last_modified)
+
+    def test_markup_is_escaped(self):
+        """Разметка из поста не становится живым HTML в читалке."""
+        Post.objects.create(
+            author=self.author, text='<script>alert(1)</script>')
+        for url in (reverse('posts:feed'), reverse('posts:feed_atom')):
+            with self.subTest(url=url):
+                content = self.client.get(url).content.decode()
+                self.assertNotIn('&lt;script&gt;', content)
+                self.assertIn('&amp;lt;script&amp;gt;', content)
+
+    def test_cached_per_host(self):
+        url = reverse('posts:feed')
+        self.client.get(url, HTTP_HOST='testserver')
+        response = self.client.get(url, HTTP_HOST='localhost')
+        self.assertIn('http://localhost/', response.content.decode())
+
+    def test_unknown_feed(self):
+        response = self.client.get(
+            reverse('posts:group_feed', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
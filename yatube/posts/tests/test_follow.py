@@ -0,0 +1,190 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.jobs import Worker
+from core.models import Job
+from posts.models import Follow, Post, TimelineEntry
+from posts.tasks import deliver_post
+from posts.timeline import fan_out_author, trim_timelines
+from posts.views import POST_QUANTITY
+
+User = get_user_model()
+
+
+class FollowTimelineTest(TestCase):
+    """Тестирование ленты подписок."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='followed_author')
+        cls.other = User.objects.create_user(username='other_author')
+        cls.old_post = Post.objects.create(
+            author=cls.author, text='Пост до подписки')
+
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader')
+        self.client.force_login(self.reader)
+
+    def feed(self, **params):
+        response = self.client.get(reverse('posts:follow_index'), params)
+        return list(response.context['page_obj'])
+
+    def follow(self, author):
+        self.client.get(
+            reverse('posts:profile_follow',
+                    kwargs={'username': author.username}))
+
+    def publish(self, author, text):
+        # В TestCase коммита нет, и задача раскладки не ставится
+        post = Post.objects.create(author=author, text=text)
+        deliver_post(post.pk)
+        return post
+
+    def test_follow_and_unfollow(self):
+        """Подписка заполняет ленту, отписка очищает её."""
+        self.follow(self.author)
+        self.assertTrue(
+            Follow.objects.filter(
+                user=self.reader, author=self.author).exists())
+        self.assertEqual(self.feed(), [self.old_post])
+
+        self.client.get(
+            reverse('posts:profile_unfollow',
+                    kwargs={'username': self.author.username}))
+        self.assertFalse(Follow.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.feed(), [])
+
+    def test_self_follow(self):
+        """На себя подписаться нельзя."""
+        self.follow(self.reader)
+        self.assertFalse(Follow.objects.filter(user=self.reader).exists())
+
+    def test_new_post_fans_out(self):
+        """Новый пост записывается в ленты подписчиков."""
+        self.follow(self.author)
+        post = self.publish(self.author, 'Новый пост')
+        self.publish(self.other, 'Чужой пост')
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists())
+        self.assertEqual(self.feed(), [post, self.old_post])
+
+    def test_feed_reads_timeline_in_one_query(self):
+        """Страница ленты читается одним запросом к TimelineEntry."""
+        self.follow(self.author)
+        self.client.get(reverse('posts:follow_index'))
+        # сессия, пользователь, знаменитости, COUNT, страница
+        with self.assertNumQueries(5):
+            self.client.get(reverse('posts:follow_index'))
+
+    @override_settings(POSTS_FANOUT_MAX_FOLLOWERS=0)
+    def test_celebrity_posts_are_merged_on_read(self):
+        """Посты авторов-знаменитостей подмешиваются при чтении."""
+        self.follow(self.other)
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Звёздный пост')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.feed(), [post, self.old_post])
+
+    @override_settings(POSTS_TIMELINE_SIZE=3)
+    def test_timeline_is_capped(self):
+        """Лента хранит не больше POSTS_TIMELINE_SIZE записей."""
+        self.follow(self.author)
+        for i in range(POST_QUANTITY):
+            self.publish(self.author, f'{i}')
+        # Лента подрезается при публикации, а не при чтении
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 3)
+        self.assertEqual(len(self.feed()), 3)
+
+    @override_settings(POSTS_TIMELINE_SIZE=3)
+    def test_trim_reads_cutoff_once_per_follower(self):
+        """Подрезка — выборка границы и DELETE на каждую длинную ленту."""
+        readers = [self.reader] + [
+            User.objects.create_user(username=f'trim_reader_{i}')
+            for i in range(2)
+        ]
+        for reader in readers:
+            Follow.objects.create(user=reader, author=self.author)
+        with override_settings(POSTS_TIMELINE_SIZE=100):
+            for i in range(5):
+                self.publish(self.author, f'{i}')
+        short = User.objects.create_user(username='trim_short')
+        TimelineEntry.objects.create(
+            user=short, post=self.old_post, pub_date=self.old_post.pub_date)
+
+        ids = [reader.pk for reader in readers] + [short.pk]
+        with self.assertNumQueries(2 * len(readers) + 1):
+            trim_timelines(ids)
+        for reader in readers:
+            self.assertEqual(
+                list(TimelineEntry.objects.filter(user=reader)
+                     .order_by('-pub_date', '-post_id')
+                     .values_list('post__text', flat=True)),
+                ['4', '3', '2'],
+            )
+        self.assertEqual(TimelineEntry.objects.filter(user=short).count(), 1)
+
+    @override_settings(POSTS_TIMELINE_SIZE=3, POSTS_FANOUT_MAX_FOLLOWERS=0)
+    def test_celebrity_part_is_capped(self):
+        """Посты знаменитостей не растягивают ленту за её размер."""
+        self.follow(self.author)
+        for i in range(POST_QUANTITY):
+            Post.objects.create(author=self.author, text=f'{i}')
+        response = self.client.get(reverse('posts:follow_index'))
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 3)
+        self.assertEqual(len(page_obj), 3)
+
+    def test_former_celebrity_is_fanned_out(self):
+        """Автор ниже порога раскладывает посты, пропущенные выше него."""
+        with override_settings(POSTS_FANOUT_MAX_FOLLOWERS=0):
+            self.follow(self.author)
+            post = Post.objects.create(author=self.author, text='Звёздный')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+
+        fan_out_author(self.author.pk)
+        self.assertEqual(self.feed(), [post, self.old_post])
+
+
+class FormerCelebrityTest(TransactionTestCase):
+    """Отписка ниже порога fan-out ставит раскладку постов в очередь."""
+
+    @override_settings(POSTS_FANOUT_MAX_FOLLOWERS=1)
+    def test_unfollow_below_threshold_fans_out(self):
+        author = User.objects.create_user(username='star')
+        readers = [
+            User.objects.create_user(username=f'fan_{i}') for i in range(2)]
+        for reader in readers:
+            Follow.objects.create(user=reader, author=author)
+        post = Post.objects.create(author=author, text='Звёздный пост')
+        self.assertFalse(TimelineEntry.objects.exists())
+
+        Follow.objects.get(user=readers[0]).delete()
+        Worker(concurrency=1, interval=0.01).run(burst=True)
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user_id', 'post_id')),
+            [(readers[1].pk, post.pk)],
+        )
+
+
+class PostDeliveryTest(TransactionTestCase):
+    """Раскладка нового поста по лентам идёт через очередь задач."""
+
+    def test_post_create_enqueues_delivery(self):
+        author = User.objects.create_user(username='deliver_author')
+        reader = User.objects.create_user(username='deliver_reader')
+        Follow.objects.create(user=reader, author=author)
+        self.client.force_login(author)
+        self.client.post(reverse('posts:post_create'), {'text': 'В очередь'})
+        post = Post.objects.get()
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(
+            Job.objects.get().task, 'posts.tasks.deliver_post')
+
+        Worker(concurrency=1, interval=0.01).run(burst=True)
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user_id', 'post_id')),
+            [(reader.pk, post.pk)],
+        )
@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.fragments import fragment_stats
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostFragmentCacheTest(TransactionTestCase):
+    """Тестирование кеша фрагментов строк ленты."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='fragment_author')
+        self.group = Group.objects.create(
+            title='Группа для фрагментов',
+            slug='fragment-group',
+        )
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Старый текст')
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+        )
+
+    def test_row_is_shared_between_feeds(self):
+        """Строка, отрендеренная для одной ленты, берётся из кеша в других."""
+        for url in self.urls:
+            self.client.get(url)
+        self.assertEqual(fragment_stats(), {'hits': 2, 'misses': 1})
+
+    def test_post_edit_invalidates_row(self):
+        """Правка поста сбрасывает его фрагмент."""
+        self.client.get(self.urls[0])
+        self.post.text = 'Новый текст'
+        self.post.save()
+
+        response = self.client.get(self.urls[0])
+        self.assertContains(response, 'Новый текст')
+        self.assertNotContains(response, 'Старый текст')
+
+    def test_author_change_invalidates_rows(self):
+        """Смена имени автора сбрасывает фрагменты его постов."""
+        self.client.get(self.urls[0])
+        self.author.first_name = 'Иван'
+        self.author.last_name = 'Петров'
+        self.author.save()
+
+        response = self.client.get(self.urls[0])
+        self.assertContains(response, 'Иван Петров')
+
+    def test_author_change_is_one_cache_write(self):
+        """Профиль автора не перебирает фрагменты всех его постов."""
+        for i in range(5):
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+        self.client.get(self.urls[0])
+        with CaptureQueriesContext(connection) as queries:
+            self.author.first_name = 'Пётр'
+            self.author.save()
+        for query in queries.captured_queries:
+            self.assertNotIn('"posts_post"."id"', query['sql'])
+        self.assertContains(self.client.get(self.urls[0]), 'Пётр')
+
+    def test_group_change_invalidates_rows(self):
+        """Новый slug группы попадает в строки главной и профиля."""
+        for url in self.urls:
+            self.client.get(url)
+        self.group.slug = 'renamed-group'
+        self.group.save()
+        new_url = reverse('posts:group_posts', args=['renamed-group'])
+        for url in (self.urls[0], self.urls[2]):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, f'href="{new_url}"')
+                self.assertNotContains(response, 'fragment-group')
+
+    def test_new_post_updates_author_count(self):
+        """Новый пост автора меняет счётчик в его старых строках."""
+        self.client.get(self.urls[0])
+        Post.objects.create(author=self.author, text='Ещё пост')
+
+        response = self.client.get(self.urls[0])
+        self.assertContains(response, 'Количество постов автора 2', 2)
@@ -0,0 +1,129 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Job
+from posts.models import Follow, Group, Post, PostCounter, TimelineEntry
+from posts.search import search_posts
+from posts.tasks import fan_out_imported
+
+User = get_user_model()
+
+
+class ImportPostsTest(TestCase):
+    """Тестирование команды import_posts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='importer')
+        cls.group = Group.objects.create(
+            title='Группа импорта',
+            slug='import-group',
+        )
+
+    def run_import(self, content, suffix):
+        with tempfile.NamedTemporaryFile(
+                'w', suffix=suffix, encoding='utf-8') as source:
+            source.write(content)
+            source.flush()
+            out, err = StringIO(), StringIO()
+            call_command(
+                'import_posts', source.name, batch_size=2,
+                batches_per_transaction=2, stdout=out, stderr=err,
+            )
+        return out.getvalue(), err.getvalue()
+
+    def test_import_jsonl(self):
+        rows = [
+            {'text': f'Импорт {i}', 'author': 'importer',
+             'group': 'import-group', 'pub_date': '2020-01-0%dT10:00:00' % i}
+            for i in range(1, 6)
+        ]
+        rows.append({'text': 'Без автора', 'author': 'nobody'})
+        content = (
+            '\n'.join(json.dumps(row) for row in rows) + '\nnot json\n[1]\n')
+        out, err = self.run_import(content, '.jsonl')
+
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 5)
+        self.assertEqual(PostCounter.for_author(
+            User.objects.get(pk=self.author.pk)), 5)
+        first = Post.objects.order_by('pub_date').first()
+        self.assertEqual(first.pub_date.year, 2020)
+        self.assertEqual(first.updated, first.pub_date)
+        # Даты пишутся значениями, настройки полей модели не меняются
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+        self.assertIn('импортировано 5, пропущено 3', out)
+        self.assertIn('nobody', err)
+        self.assertIn('ожидался объект JSON', err)
+        # Поисковый индекс заполняют триггеры, а не сигналы
+        self.assertEqual(
+            search_posts(Post.objects.all(), 'Импорт').count(), 5)
+
+    def test_import_csv(self):
+        content = (
+            'text,author,group\n'
+            'Первый,importer,\n'
+            'Второй,importer,import-group\n'
+        )
+        self.run_import(content, '.csv')
+
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 1)
+        self.assertEqual(PostCounter.for_author(
+            User.objects.get(pk=self.author.pk)), 2)
+
+
+class ImportFanOutTest(TransactionTestCase):
+    """Раскладка импортированных постов по лентам подписчиков."""
+
+    @override_settings(POSTS_TIMELINE_SIZE=3)
+    def test_imported_posts_reach_followers_once(self):
+        author = User.objects.create_user(username='importer')
+        other = User.objects.create_user(username='other_importer')
+        readers = [
+            User.objects.create_user(username=f'import_reader_{i}')
+            for i in range(2)
+        ]
+        for reader in readers:
+            Follow.objects.create(user=reader, author=author)
+        rows = [
+            {'text': f'Импорт {i}', 'author': 'importer',
+             'pub_date': f'2020-01-0{i}T10:00:00'}
+            for i in range(1, 8)
+        ]
+        rows.append({'text': 'Чужой', 'author': 'other_importer'})
+        with tempfile.NamedTemporaryFile(
+                'w', suffix='.jsonl', encoding='utf-8') as source:
+            source.write('\n'.join(json.dumps(row) for row in rows))
+            source.flush()
+            with CaptureQueriesContext(connection) as queries:
+                call_command(
+                    'import_posts', source.name, batch_size=2,
+                    batches_per_transaction=1, stdout=StringIO(),
+                )
+        # Четыре пачки, но ленты не трогаются, пока идёт импорт
+        self.assertFalse(any(
+            'posts_timelineentry' in query['sql']
+            for query in queries.captured_queries))
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'posts.tasks.fan_out_imported')
+        self.assertEqual(
+            json.loads(job.payload)['args'], [[author.pk, other.pk]])
+
+        # На автора: знаменитость, посты, подписчики; на каждую ленту:
+        # BEGIN, INSERT и граница; автор без подписчиков — три запроса
+        with self.assertNumQueries(3 + 2 * 3 + 3):
+            fan_out_imported(*json.loads(job.payload)['args'])
+        for reader in readers:
+            self.assertEqual(
+                list(TimelineEntry.objects.filter(user=reader)
+                     .order_by('-pub_date')
+                     .values_list('post__text', flat=True)),
+                ['Импорт 7', 'Импорт 6', 'Импорт 5'],
+            )
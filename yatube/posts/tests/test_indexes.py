@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.views import POST_QUANTITY
+
+User = get_user_model()
+
+
+def explain_query_plan(sql):
+    """Строки EXPLAIN QUERY PLAN для выполненного запроса."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def slow_plan_steps(plan):
+    """Шаги плана с временной сортировкой или полным сканом постов."""
+    return [
+        step for step in plan
+        if 'TEMP B-TREE' in step
+        or (step.startswith('SCAN') and 'posts_post' in step
+            and 'INDEX' not in step)
+    ]
+
+
+class FeedIndexesTest(TestCase):
+    """Запросы лент к posts_post обслуживаются индексами."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='index_author')
+        cls.group = Group.objects.create(
+            title='Группа для индексов',
+            slug='index-group',
+        )
+        for i in range(POST_QUANTITY + 1):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group, text=f'{i}')
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_indexed(self, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, data)
+        post_queries = [
+            query['sql'] for query in queries.captured_queries
+            if '"posts_post"' in query['sql']
+        ]
+        self.assertTrue(post_queries)
+        for sql in post_queries:
+            plan = explain_query_plan(sql)
+            self.assertEqual(
+                slow_plan_steps(plan), [], f'{sql}\n{plan}')
+
+    def feed_urls(self):
+        return (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+        )
+
+    def test_feeds_use_indexes(self):
+        """Ленты с ?page=N не сортируют во временном B-дереве."""
+        for url in self.feed_urls():
+            for page in (1, 2):
+                with self.subTest(url=url, page=page):
+                    self.assert_indexed(url, {'page': page})
+
+    @override_settings(POSTS_CURSOR_PAGINATION=True)
+    def test_cursor_feeds_use_indexes(self):
+        """Keyset-ленты идут по индексу в обе стороны."""
+        for url in self.feed_urls():
+            page_obj = self.client.get(url).context['page_obj']
+            with self.subTest(url=url):
+                self.assert_indexed(url, {'after': page_obj.next_cursor})
+                self.assert_indexed(url, {'before': page_obj.next_cursor})
+
+    def test_post_detail_uses_primary_key(self):
+        """Страница поста ищет его по первичному ключу."""
+        self.assert_indexed(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
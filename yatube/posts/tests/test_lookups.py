@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.checks import check_shared_cache
+from posts.lookups import LookupCache, groups, users
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class LookupCacheTest(TestCase):
+    """Тестирование кеша групп и пользователей."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='lookup_author')
+        cls.group = Group.objects.create(
+            title='Группа поиска по slug',
+            slug='lookup-group',
+        )
+        Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост для кеша')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_list_pages_skip_lookup_query(self):
+        """Повторный заход на группу и профиль не ищет их в базе."""
+        urls = (
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+        )
+        for url in urls:
+            self.client.get(url)
+            # сессия + пользователь + посты страницы со счётчиком автора
+            with self.subTest(url=url), self.assertNumQueries(3):
+                response = self.client.get(url)
+            self.assertContains(response, 'Пост для кеша')
+
+        response = self.client.get(urls[1])
+        self.assertIsInstance(response.context['author'], User)
+        self.assertEqual(response.context['posts_count'], 1)
+
+    def test_instances_are_not_shared(self):
+        first, second = groups.get('lookup-group'), groups.get('lookup-group')
+        self.assertIsNot(first, second)
+        self.assertEqual(first, second)
+        self.assertIsNone(users.get('nobody'))
+
+    def test_save_invalidates_other_processes(self):
+        """Версия в общем кеше сбрасывает LRU других процессов."""
+        other_process = LookupCache(Group, 'slug')
+        self.assertEqual(other_process.get('lookup-group').title,
+                         self.group.title)
+
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'renamed-group'
+        group.save()
+
+        self.assertIsNone(other_process.get('lookup-group'))
+        self.assertEqual(other_process.get('renamed-group').pk, group.pk)
+        response = self.client.get(
+            reverse('posts:group_posts', kwargs={'slug': 'lookup-group'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_login_keeps_entries(self):
+        users.get(self.author.username)
+        version = users.version(self.author.username)
+        Client().force_login(self.author)
+        self.assertEqual(users.version(self.author.username), version)
+
+    def test_save_invalidates_only_its_row(self):
+        users.get(self.author.username)
+        version = users.version(self.author.username)
+        User.objects.create_user(username='other_lookup').save()
+        self.assertEqual(users.version(self.author.username), version)
+
+        author = User.objects.get(pk=self.author.pk)
+        author.username = 'renamed_author'
+        author.save()
+        self.assertIsNone(users.get('lookup_author'))
+        self.assertEqual(users.get('renamed_author').pk, author.pk)
+
+    @override_settings(POSTS_LOOKUP_SHARED_CACHE=True)
+    def test_secrets_are_not_cached(self):
+        users.get(self.author.username)
+        _, row = cache.get(f'posts:lookup:auth.user:{self.author.username}')
+        self.assertNotIn(self.author.password, row)
+        self.assertEqual(len(row), 5)
+
+    @override_settings(POSTS_LOOKUP_CACHE_SIZE=1)
+    def test_size_is_bounded(self):
+        lookups = LookupCache(User, 'username')
+        lookups.get(self.author.username)
+        User.objects.create_user(username='second_lookup')
+        lookups.get('second_lookup')
+        self.assertEqual(list(lookups.entries), ['second_lookup'])
+
+    @override_settings(
+        POSTS_LOOKUP_LOCAL_TIMEOUT=0, POSTS_LOOKUP_SHARED_CACHE=False)
+    def test_entries_expire(self):
+        lookups = LookupCache(Group, 'slug')
+        lookups.get('lookup-group')
+        with self.assertNumQueries(1):
+            self.assertEqual(lookups.get('lookup-group').pk, self.group.pk)
+
+
+class SharedCacheCheckTest(TestCase):
+    """Проверка, что кеш по умолчанию общий для процессов."""
+
+    locmem = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+    def test_configured_cache_is_shared(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    def test_locmem_cache_is_refused(self):
+        with self.settings(CACHES=self.locmem):
+            self.assertEqual(
+                [error.id for error in check_shared_cache(None)],
+                ['posts.E001'])
+            with self.settings(POSTS_LOOKUP_SHARED_CACHE=False):
+                self.assertEqual(
+                    [error.id for error in check_shared_cache(None)],
+                    ['posts.W001'])
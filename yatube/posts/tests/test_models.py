@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import Group, Post, PostCounter
 
 User = get_user_model()
 
@@ -54,3 +54,46 @@ class PostModelTest(TestCase):
             with self.subTest(value=value):
                 self.assertEqual(
                     post._meta.get_field(value).help_text, expected)
+
+
+class PostCounterTest(TestCase):
+    """Тестирование счётчика постов автора."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='counter_author')
+
+    def test_counter_follows_create_and_delete(self):
+        """Создание и удаление поста обновляют счётчик."""
+        first = Post.objects.create(author=self.user, text='Первый пост')
+        Post.objects.create(author=self.user, text='Второй пост')
+        self.assertEqual(
+            PostCounter.objects.get(author=self.user).posts_count, 2)
+
+        first.delete()
+        self.assertEqual(
+            PostCounter.objects.get(author=self.user).posts_count, 1)
+
+        Post.objects.filter(author=self.user).delete()
+        self.assertEqual(
+            PostCounter.objects.get(author=self.user).posts_count, 0)
+
+    def test_rebuild(self):
+        """rebuild восстанавливает счётчики после bulk_create."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'{i}') for i in range(3)
+        )
+        self.assertFalse(PostCounter.objects.filter(author=self.user).exists())
+
+        PostCounter.rebuild()
+        self.assertEqual(
+            PostCounter.objects.get(author=self.user).posts_count, 3)
+
+    def test_author_delete(self):
+        """Удаление автора каскадом не оставляет счётчик."""
+        author = User.objects.create_user(username='removed_author')
+        Post.objects.create(author=author, text='Пост удалённого автора')
+        author.delete()
+        self.assertFalse(
+            PostCounter.objects.filter(author_id=author.pk).exists())
@@ -0,0 +1,144 @@
+from io import StringIO
+
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, PostCounter, TimelineEntry
+from posts.moderation import Moderation
+from posts.page_cache import VERSION_KEY
+from posts.paginators import count_cache_key
+from posts.search import search_posts
+
+User = get_user_model()
+
+
+class ModerationTest(TestCase):
+    """Тестирование массовой модерации постов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.author = User.objects.create_user(username='moderated_author')
+        cls.reader = User.objects.create_user(username='moderated_reader')
+        cls.old = Group.objects.create(title='Старая', slug='old-group')
+        cls.new = Group.objects.create(title='Новая', slug='new-group')
+        Follow.objects.create(user=cls.reader, author=cls.spammer)
+        for i in range(7):
+            Post.objects.create(
+                author=cls.spammer, group=cls.old, text=f'Спам {i}')
+        for i in range(3):
+            Post.objects.create(
+                author=cls.author, group=cls.old, text=f'Пост {i}')
+
+    def setUp(self):
+        cache.clear()
+        for scope in ('index', f'group:{self.old.pk}',
+                      f'group:{self.new.pk}', f'author:{self.spammer.pk}'):
+            cache.set(count_cache_key(scope), self.count(scope))
+            cache.set(VERSION_KEY.format(scope), 1)
+
+    def count(self, scope):
+        kind, _, pk = scope.partition(':')
+        posts = Post.objects.all()
+        return posts.filter(**{f'{kind}_id': pk}).count() if pk else (
+            posts.count())
+
+    def assert_cached_counts(self, untouched=()):
+        for scope in ('index', f'group:{self.old.pk}',
+                      f'group:{self.new.pk}', f'author:{self.spammer.pk}'):
+            with self.subTest(scope=scope):
+                self.assertEqual(
+                    cache.get(count_cache_key(scope)), self.count(scope))
+                self.assertEqual(
+                    cache.get(VERSION_KEY.format(scope)),
+                    1 if scope in untouched else 2,
+                )
+
+    def test_delete_in_chunks(self):
+        done = []
+        with CaptureQueriesContext(connection) as queries:
+            deleted = Moderation(3, done.append).delete(
+                Post.objects.filter(author=self.spammer))
+        self.assertEqual(deleted, 7)
+        self.assertEqual(done, [3, 6, 7])
+        self.assertFalse(Post.objects.filter(author=self.spammer).exists())
+        self.assertEqual(Post.objects.count(), 3)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertFalse(search_posts(Post.objects.all(), 'Спам').exists())
+        self.assertEqual(PostCounter.for_author(
+            User.objects.get(pk=self.spammer.pk)), 0)
+        self.assert_cached_counts(untouched=[f'group:{self.new.pk}'])
+        # Запросов на пачку постоянное число, а не на каждый пост
+        self.assertLess(len(queries), 30)
+
+    def test_move_in_chunks(self):
+        moved = Moderation(2).move(
+            Post.objects.filter(group=self.old), self.new)
+        self.assertEqual(moved, 10)
+        self.assertFalse(self.old.posts.exists())
+        self.assertEqual(self.new.posts.count(), 10)
+        self.assertEqual(PostCounter.for_author(
+            User.objects.get(pk=self.spammer.pk)), 7)
+        self.assert_cached_counts()
+
+        moved = Moderation().move(Post.objects.filter(group=self.new), None)
+        self.assertEqual(moved, 10)
+        self.assertEqual(Post.objects.filter(group=None).count(), 10)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('moderate_posts', 'move', group='old-group',
+                     to_group='new-group', chunk_size=4, stdout=out)
+        self.assertEqual(self.new.posts.count(), 10)
+        self.assertIn('Обработано 8 из 10', out.getvalue())
+        self.assertIn('Перенесено постов: 10', out.getvalue())
+
+        call_command('moderate_posts', 'delete', author='spammer',
+                     stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 3)
+
+        with self.assertRaises(CommandError):
+            call_command('moderate_posts', 'delete', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('moderate_posts', 'move', author='spammer',
+                         to_group='missing', stdout=StringIO())
+
+    def test_admin_actions(self):
+        admin = User.objects.create_superuser(
+            'moderator', 'moderator@example.com', 'password')
+        client = Client()
+        client.force_login(admin)
+        url = reverse('admin:posts_post_changelist')
+        selected = list(
+            Post.objects.filter(author=self.spammer)
+            .values_list('pk', flat=True)
+        )
+        data = {
+            'action': 'move_to_group',
+            helpers.ACTION_CHECKBOX_NAME: selected,
+        }
+
+        response = client.post(url, data)
+        self.assertTemplateUsed(response, 'admin/posts/post/moderate.html')
+        self.assertEqual(self.new.posts.count(), 0)
+
+        response = client.post(
+            url, {**data, 'apply': '1', 'group': self.new.pk})
+        self.assertRedirects(response, url)
+        self.assertEqual(self.new.posts.count(), 7)
+
+        response = client.post(url, {
+            'action': 'delete_posts',
+            helpers.ACTION_CHECKBOX_NAME: selected,
+            'apply': '1',
+        })
+        self.assertRedirects(response, url)
+        self.assertEqual(Post.objects.count(), 3)
+        choices = client.get(url).context['action_form'].fields['action']
+        self.assertNotIn('delete_selected', dict(choices.choices))
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from django.test.signals import template_rendered
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTest(TransactionTestCase):
+    """Тестирование кеша страниц лент для анонимов."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='page_author')
+        self.group = Group.objects.create(
+            title='Группа для кеша страниц',
+            slug='page-group',
+        )
+        self.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-page-group',
+        )
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Первый пост')
+        self.index_url = reverse('posts:index')
+        self.group_url = reverse(
+            'posts:group_posts', kwargs={'slug': self.group.slug})
+        self.other_group_url = reverse(
+            'posts:group_posts', kwargs={'slug': self.other_group.slug})
+
+    def warm(self, *urls):
+        for url in urls:
+            self.client.get(url)
+
+    def test_anonymous_hit_skips_database(self):
+        """Повторный анонимный запрос не ходит в базу."""
+        self.warm(self.index_url, self.group_url)
+        for url in (self.index_url, self.group_url):
+            with self.subTest(url=url):
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertContains(response, 'Первый пост')
+
+    def test_bypass(self):
+        """Авторизованные и запросы с лишними параметрами не кешируются."""
+        self.warm(self.index_url)
+        with self.assertNumQueries(1):
+            self.client.get(self.index_url, {'page': 1, 'utm': 'x'})
+
+        self.client.force_login(self.author)
+        response = self.client.get(self.index_url)
+        self.assertIsNotNone(response.context)
+
+    def test_new_post_purges_only_its_feeds(self):
+        """Новый пост сбрасывает главную и свою группу, но не чужую."""
+        self.warm(self.index_url, self.group_url, self.other_group_url)
+        Post.objects.create(
+            author=self.author, group=self.group, text='Второй пост')
+
+        for url in (self.index_url, self.group_url):
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Второй пост')
+        with self.assertNumQueries(0):
+            self.client.get(self.other_group_url)
+
+    def test_post_edit_purges_old_and_new_group(self):
+        """Перенос поста в другую группу сбрасывает обе ленты."""
+        self.warm(self.group_url, self.other_group_url)
+        self.client.force_login(self.author)
+        self.client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            {'text': 'Перенесённый пост', 'group': self.other_group.pk},
+        )
+        self.client.logout()
+
+        self.assertNotContains(self.client.get(self.group_url), 'пост')
+        self.assertContains(
+            self.client.get(self.other_group_url), 'Перенесённый пост')
+
+    def test_delete_purges_feeds(self):
+        """Удаление поста сбрасывает страницы."""
+        self.warm(self.index_url)
+        self.post.delete()
+        self.assertNotContains(self.client.get(self.index_url), 'Первый пост')
+
+    def test_post_during_render_is_not_cached_as_fresh(self):
+        """Пост, закоммиченный во время рендера, виден на следующем запросе."""
+        def publish(sender, template, **kwargs):
+            if template.name == 'includes/post_row.html':
+                template_rendered.disconnect(publish)
+                Post.objects.create(author=self.author, text='Пост в рендере')
+
+        template_rendered.connect(publish)
+        self.addCleanup(template_rendered.disconnect, publish)
+        self.assertNotContains(self.client.get(self.index_url), 'в рендере')
+        self.assertContains(self.client.get(self.index_url), 'в рендере')
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.paginators import count_cache_key
+from posts.views import POST_QUANTITY
+
+User = get_user_model()
+
+
+def count_queries(queries):
+    return [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('SELECT COUNT(*)')
+    ]
+
+
+class CachedCountPaginatorTest(TransactionTestCase):
+    """Тестирование закешированных количеств постов."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='count_author')
+        self.group = Group.objects.create(
+            title='Группа для количеств',
+            slug='count-group',
+        )
+        for i in range(POST_QUANTITY + 2):
+            Post.objects.create(
+                author=self.author, group=self.group, text=f'{i}')
+        self.urls = {
+            reverse('posts:index'): 'index',
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}):
+                f'group:{self.group.pk}',
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}):
+                f'author:{self.author.pk}',
+        }
+
+    def test_warm_request_without_count(self):
+        """Тёплый запрос не выполняет COUNT(*)."""
+        # Анонимам отдаётся кеш целой страницы, проверяем рендер
+        self.client.force_login(self.author)
+        for url in self.urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as cold:
+                    self.client.get(url)
+                with CaptureQueriesContext(connection) as warm:
+                    response = self.client.get(url)
+                self.assertEqual(len(count_queries(cold)), 1)
+                self.assertEqual(count_queries(warm), [])
+                self.assertEqual(
+                    response.context['page_obj'].paginator.num_pages, 2)
+
+    def test_signals_update_cached_counts(self):
+        """Создание, перенос и удаление поста правят кеш на месте."""
+        for url in self.urls:
+            self.client.get(url)
+        post = Post.objects.create(
+            author=self.author, group=self.group, text='Новый пост')
+        for scope in self.urls.values():
+            with self.subTest(scope=scope):
+                self.assertEqual(
+                    cache.get(count_cache_key(scope)), POST_QUANTITY + 3)
+
+        post.group = None
+        post.save()
+        self.assertEqual(
+            cache.get(count_cache_key(f'group:{self.group.pk}')),
+            POST_QUANTITY + 2,
+        )
+
+        Post.objects.filter(author=self.author).delete()
+        self.assertEqual(cache.get(count_cache_key('index')), 0)
+
+    @override_settings(POSTS_COUNT_APPROXIMATE_LIMIT=5)
+    def test_approximate_count(self):
+        """Приблизительный режим ограничивает COUNT(*)."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 5)
+        self.assertEqual(len(response.context['page_obj']), POST_QUANTITY)
+
+    @override_settings(POSTS_COUNT_APPROXIMATE_LIMIT=5)
+    def test_approximate_count_keeps_pages_reachable(self):
+        """Страницы за приблизительным количеством открываются."""
+        self.client.force_login(self.author)
+        url = reverse('posts:index')
+        page_obj = self.client.get(url).context['page_obj']
+        self.assertTrue(page_obj.has_next())
+
+        response = self.client.get(url, {'page': 2})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.number, 2)
+        self.assertEqual(len(page_obj), 2)
+        self.assertFalse(page_obj.has_next())
+        self.assertNotContains(response, 'Последняя')
+
+        response = self.client.get(url, {'page': 3})
+        self.assertEqual(response.context['page_obj'].number, 1)
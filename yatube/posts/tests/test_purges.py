@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.jobs import Worker
+from core.models import Job
+from posts.models import (AuthorPurge, Follow, FollowerCounter, Post,
+                          TimelineEntry)
+from posts.purges import disable_authors, pending_purges, purge_author
+from posts.timeline import fan_out_post
+
+User = get_user_model()
+
+
+class AuthorPurgeTest(TestCase):
+    """Тестирование отложенного удаления авторов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'purge_admin', 'admin@example.com', 'password')
+        cls.author = User.objects.create_user(username='prolific')
+        cls.reader = User.objects.create_user(username='purge_reader')
+        Follow.objects.create(user=cls.author, author=cls.reader)
+        for i in range(5):
+            Post.objects.create(author=cls.author, text=f'Пост {i}')
+        Post.objects.create(author=cls.reader, text='Чужой пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_admin_delete_disables_user(self):
+        client = Client()
+        client.force_login(self.admin)
+        url = reverse('admin:auth_user_delete', args=[self.author.pk])
+        self.assertContains(client.get(url), 'Посты, удаляемые в фоне: 5')
+
+        client.post(url, {'post': 'yes'})
+        author = User.objects.get(pk=self.author.pk)
+        self.assertFalse(author.is_active)
+        self.assertEqual(author.posts.count(), 5)
+        purge = AuthorPurge.objects.get(author=author)
+        self.assertEqual(purge.status, AuthorPurge.PENDING)
+
+        # Отключённый пользователь больше не авторизован
+        author_client = Client()
+        author_client.force_login(author)
+        response = author_client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_command_purges_posts_then_user(self):
+        disable_authors([self.author])
+        out = StringIO()
+        call_command('purge_authors', chunk_size=2, stdout=out)
+
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertFalse(
+            FollowerCounter.objects.get(author=self.reader).followers_count)
+        purge = AuthorPurge.objects.get(username='prolific')
+        self.assertEqual(purge.status, AuthorPurge.DONE)
+        self.assertEqual(purge.posts_deleted, 5)
+        self.assertIsNone(purge.author)
+        self.assertIsNotNone(purge.finished)
+        self.assertIn('prolific: удалено постов 4', out.getvalue())
+        self.assertFalse(pending_purges().exists())
+
+    def test_follows_and_timeline_purged_in_chunks(self):
+        readers = [
+            User.objects.create_user(username=f'purge_fan_{i}')
+            for i in range(3)
+        ]
+        for reader in readers:
+            Follow.objects.create(user=self.author, author=reader)
+            Follow.objects.create(user=reader, author=self.author)
+        fan_out_post(Post.objects.create(author=readers[0], text='В ленту'))
+        self.assertTrue(TimelineEntry.objects.filter(user=self.author))
+
+        disable_authors([self.author])
+        purge_author(AuthorPurge.objects.get(), chunk_size=2)
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+        for reader in readers:
+            self.assertEqual(
+                FollowerCounter.objects.get(author=reader).followers_count,
+                0)
+
+    def test_interrupted_purge_resumes(self):
+        disable_authors([self.author])
+        purge = AuthorPurge.objects.get()
+
+        def crash(purge, done):
+            raise RuntimeError('процесс остановлен')
+
+        with self.assertRaises(RuntimeError):
+            purge_author(purge, chunk_size=2, progress=crash)
+        purge.refresh_from_db()
+        self.assertEqual(purge.status, AuthorPurge.FAILED)
+        self.assertEqual(purge.posts_deleted, 2)
+        self.assertIn('процесс остановлен', purge.error)
+        self.assertEqual(Post.objects.filter(author=self.author).count(), 3)
+        self.assertFalse(pending_purges().exists())
+
+        call_command('purge_authors', retry_failed=True, stdout=StringIO())
+        purge.refresh_from_db()
+        self.assertEqual(purge.status, AuthorPurge.DONE)
+        self.assertEqual(purge.posts_deleted, 5)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+
+    def test_running_purge_is_not_taken_twice(self):
+        disable_authors([self.author])
+        purges = AuthorPurge.objects.filter(pk=AuthorPurge.objects.get().pk)
+        purges.update(status=AuthorPurge.RUNNING, updated=timezone.now())
+        self.assertFalse(pending_purges(retry_failed=True).exists())
+        self.assertFalse(purge_author(purges.get()))
+        out = StringIO()
+        call_command('purge_authors', stdout=out)
+        self.assertEqual(Post.objects.filter(author=self.author).count(), 5)
+
+        # Удаление без движения дольше аренды забирается заново
+        purges.update(updated=timezone.now() - timedelta(
+            seconds=settings.POSTS_PURGE_LEASE_TIMEOUT + 1))
+        call_command('purge_authors', stdout=out)
+        self.assertEqual(purges.get().status, AuthorPurge.DONE)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+
+
+class AuthorPurgeJobTest(TransactionTestCase):
+    """Удаление автора выполняет воркер очереди задач."""
+
+    def test_worker_purges_disabled_author(self):
+        author = User.objects.create_user(username='queued_author')
+        for i in range(3):
+            Post.objects.create(author=author, text=f'Пост {i}')
+        disable_authors([author])
+        self.assertEqual(
+            Job.objects.filter(
+                task='posts.tasks.purge_deleted_author').count(), 1)
+
+        Worker(concurrency=1, interval=0.01).run(burst=True)
+        self.assertFalse(User.objects.filter(pk=author.pk).exists())
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(
+            AuthorPurge.objects.get().status, AuthorPurge.DONE)
@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import EXCERPT_LENGTH, Follow, Group, Post
+
+User = get_user_model()
+
+
+class RenderedTextTest(TestCase):
+    """Тестирование готовых колонок с отрывком и HTML текста."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='rendered_author')
+        cls.reader = User.objects.create_user(username='rendered_reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='rendered-group')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            group=cls.group,
+            text='<b>Первый</b> абзац\n\nВторой абзац ' + 'слово ' * 100,
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_text_is_rendered_on_save(self):
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertLessEqual(len(post.excerpt), EXCERPT_LENGTH)
+        self.assertTrue(post.excerpt.endswith('…'))
+        self.assertTrue(post.text_html.startswith(
+            '<p>&lt;b&gt;Первый&lt;/b&gt; абзац</p>\n\n<p>Второй абзац'))
+        self.assertTrue(post.excerpt_html.startswith('<p>&lt;b&gt;'))
+        self.assertEqual(str(post), post.text[:15])
+
+    def test_update_fields_rerenders(self):
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Короткий & новый'
+        post.save(update_fields=['text'])
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.excerpt, 'Короткий & новый')
+        self.assertEqual(post.text_html, '<p>Короткий &amp; новый</p>')
+        self.assertEqual(post.excerpt_html, post.text_html)
+
+    def test_lists_do_not_load_text(self):
+        client = self.client
+        client.force_login(self.reader)
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                self.assertContains(response, '&lt;b&gt;Первый')
+                self.assertNotContains(response, 'слово ' * 100)
+                for query in queries.captured_queries:
+                    self.assertNotIn(
+                        '"posts_post"."text"', query['sql'])
+                    self.assertNotIn(
+                        '"posts_post"."text_html"', query['sql'])
+
+    def test_detail_shows_full_html(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertContains(response, self.post.text_html, html=False)
@@ -0,0 +1,76 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.views import POST_QUANTITY
+
+User = get_user_model()
+
+NEXT_ROWS = re.compile(r'data-next-rows="([^"]+)"')
+
+
+class FeedRowsTest(TestCase):
+    """Тестирование строк лент для бесконечной прокрутки."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='rows_author')
+        cls.other = User.objects.create_user(username='rows_other')
+        cls.group = Group.objects.create(title='Строки', slug='rows-group')
+        for i in range(POST_QUANTITY * 2 + 5):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Строка {i}')
+        Post.objects.create(author=cls.other, text='Чужая строка')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def scroll(self, url):
+        """Тексты постов на странице и во всех подгруженных строках."""
+        response = self.client.get(url)
+        texts = re.findall(r'<p>(.*?)</p>', response.content.decode())
+        next_url = NEXT_ROWS.search(response.content.decode())
+        while next_url:
+            response = self.client.get(next_url.group(1))
+            content = response.content.decode()
+            self.assertNotIn('<html', content)
+            texts += re.findall(r'<p>(.*?)</p>', content)
+            next_url = NEXT_ROWS.search(content)
+            self.assertEqual(response.has_header('Link'), bool(next_url))
+        return texts
+
+    def test_scroll_covers_feed_once(self):
+        cases = {
+            reverse('posts:index'): Post.objects.all(),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}):
+                self.group.posts.all(),
+            reverse('posts:profile',
+                    kwargs={'username': self.other.username}):
+                self.other.posts.all(),
+        }
+        for url, posts in cases.items():
+            with self.subTest(url=url):
+                texts = [
+                    text for text in self.scroll(url)
+                    if text.startswith(('Строка', 'Чужая'))
+                ]
+                self.assertEqual(
+                    texts, list(posts.values_list('text', flat=True)))
+
+    def test_rows_are_smaller_than_page(self):
+        page = self.client.get(reverse('posts:index'), {'page': 2})
+        rows_url = NEXT_ROWS.search(
+            self.client.get(reverse('posts:index')).content.decode()
+        ).group(1)
+        rows = self.client.get(rows_url)
+        self.assertLess(len(rows.content), len(page.content))
+
+    def test_unknown_feed(self):
+        response = self.client.get(
+            reverse('posts:group_rows', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,93 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.search import FTS_TABLE
+from posts.views import POST_QUANTITY
+
+User = get_user_model()
+
+
+class PostSearchTest(TestCase):
+    """Тестирование полнотекстового поиска."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='search_author')
+        cls.rare = Post.objects.create(
+            author=cls.author,
+            text='Про котиков, котиков и ещё раз котиков <b>жирно</b>',
+        )
+        cls.common = Post.objects.create(
+            author=cls.author,
+            text='Длинный пост про собак, где котиков упомянули один раз',
+        )
+        Post.objects.create(author=cls.author, text='Совсем про другое')
+
+    def search(self, query, **params):
+        return self.client.get(
+            reverse('posts:search'), {'q': query, **params})
+
+    def test_ranked_results_with_snippets(self):
+        """Результаты отсортированы по релевантности и подсвечены."""
+        response = self.search('котиков')
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), [self.rare, self.common])
+        self.assertContains(response, '<mark>котиков</mark>')
+        self.assertContains(response, '&lt;b&gt;жирно&lt;/b&gt;')
+        self.assertNotContains(response, '<b>жирно</b>')
+
+    def test_index_follows_edit_and_delete(self):
+        """Триггеры переиндексируют правку и удаление."""
+        common = Post.objects.get(pk=self.common.pk)
+        common.text = 'Теперь только про собак'
+        common.save()
+        self.assertEqual(
+            list(self.search('котиков').context['page_obj']), [self.rare])
+
+        Post.objects.get(pk=self.rare.pk).delete()
+        self.assertEqual(
+            list(self.search('котиков').context['page_obj']), [])
+
+    def test_unsafe_queries(self):
+        """Синтаксис FTS5 в запросе не ломает страницу."""
+        for query in ('"', 'котиков"', 'AND', 'NEAR(', '*', '-', ''):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query).status_code, 200)
+
+    def test_pagination_keeps_query(self):
+        """Ссылки паджинатора сохраняют запрос."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пагинация {i}')
+            for i in range(POST_QUANTITY + 1)
+        )
+        response = self.search('пагинация')
+        self.assertContains(response, 'href="?q=%D0%BF')
+        response = self.search('пагинация', page=2)
+        self.assertEqual(len(response.context['page_obj']), 1)
+
+    def test_rebuild_command(self):
+        """Команда перестраивает индекс с нуля."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+        self.assertEqual(list(self.search('котиков').context['page_obj']), [])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(
+            len(self.search('котиков').context['page_obj']), 2)
+
+    def test_admin_search(self):
+        """Поиск в админке идёт через FTS5."""
+        admin = User.objects.create_superuser(
+            'search_admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'котиков'})
+        self.assertEqual(response.context['cl'].result_count, 2)
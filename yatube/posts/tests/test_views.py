@@ -1,10 +1,14 @@
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 
 from posts.forms import PostForm
 from posts.models import Group, Post
+from posts.paginators import CursorPaginator
 from posts.views import POST_QUANTITY
 
 User = get_user_model()
@@ -48,6 +52,7 @@ class PostsViewsTests(TestCase):
             )
 
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username='views_user')
         self.guest_client = Client()
         self.authorized_client = Client()
@@ -239,6 +244,38 @@ class PostsViewsTests(TestCase):
             with self.subTest(element=entity):
                 self.assertEqual(entity, entities)
 
+    def test_posts_count_without_count_queries(self):
+        """Количество постов автора берётся из счётчика без COUNT."""
+        # MAX(updated) и COUNT валидаторов, которые заодно кешируют
+        # количество для паджинатора, + выборка постов с авторами и группами
+        with self.assertNumQueries(2):
+            response = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Количество постов автора 10')
+
+        # валидаторы условного GET + пост с автором, счётчиком и группой
+        with self.assertNumQueries(2):
+            response = self.guest_client.get(
+                reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+            )
+        self.assertContains(response, '<span>10</span>')
+
+    def test_post_pages_fixed_queries(self):
+        """Страницы поста и его правки — один запрос за постом."""
+        author_client = Client()
+        author_client.force_login(self.author)
+        detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.id})
+        edit_url = reverse('posts:post_edit', kwargs={'post_id': self.post.id})
+        # сессия + пользователь + пост с автором, группой и счётчиком
+        with self.assertNumQueries(3):
+            response = author_client.get(detail_url)
+        self.assertContains(response, '<span>10</span>')
+        self.assertEqual(response.context['post'].author_posts_count, 10)
+        # то же + группы для выбора в форме
+        with self.assertNumQueries(4):
+            response = author_client.get(edit_url)
+        self.assertEqual(response.status_code, 200)
+
     def test_post_not_found(self):
         """Проверка отсутствия записи не в той группе."""
         response = self.authorized_client.get(
@@ -278,6 +315,7 @@ class PaginatorViewsTest(TestCase):
         Post.objects.bulk_create(cls.posts)
 
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             username='paginator_user'
         )
@@ -323,3 +361,72 @@ class PaginatorViewsTest(TestCase):
 
         for response, quantity in response_types.items():
             self.assertEqual(len(response.context['page_obj']), quantity)
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+class CursorPaginatorViewsTest(TestCase):
+    """Тестирование keyset-паджинации."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username='cursor_author')
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'{i}')
+            for i in range(POST_QUANTITY * 2 + 3)
+        )
+        cls.expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_walk_forward_and_back(self):
+        """Курсоры обходят ленту без пропусков и повторов."""
+        url = reverse('posts:index')
+        response = self.client.get(url)
+        page_obj = response.context['page_obj']
+        self.assertIsInstance(page_obj.paginator, CursorPaginator)
+        self.assertFalse(page_obj.has_previous())
+        self.assertIsNone(page_obj.next_page_number())
+
+        seen = [post.pk for post in page_obj]
+        pages = [page_obj]
+        while page_obj.has_next():
+            response = self.client.get(
+                url, {'after': page_obj.next_cursor})
+            page_obj = response.context['page_obj']
+            seen.extend(post.pk for post in page_obj)
+            pages.append(page_obj)
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages[-1]), 3)
+
+        response = self.client.get(
+            url, {'before': pages[-1].previous_cursor})
+        page_obj = response.context['page_obj']
+        self.assertEqual(
+            [post.pk for post in page_obj],
+            [post.pk for post in pages[-2]],
+        )
+        self.assertTrue(page_obj.has_next())
+
+    def test_deep_page_without_count(self):
+        """Страница по курсору не делает COUNT и OFFSET."""
+        first = self.client.get(reverse('posts:index')).context['page_obj']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse('posts:index'), {'after': first.next_cursor})
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT', query['sql'])
+            self.assertNotIn('OFFSET', query['sql'])
+
+    def test_broken_cursor(self):
+        """Испорченный курсор открывает первую страницу."""
+        response = self.client.get(reverse('posts:index'), {'after': '%%%'})
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            self.expected[:POST_QUANTITY],
+        )
@@ -0,0 +1,186 @@
+from heapq import merge
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .models import Follow, FollowerCounter, Post, PostCounter, TimelineEntry
+
+FEED_RELATED = ('author__post_counter', 'group')
+
+
+def is_celebrity(author_id):
+    """У автора столько подписчиков, что его посты читаются на лету."""
+    return FollowerCounter.objects.filter(
+        author_id=author_id,
+        followers_count__gt=settings.POSTS_FANOUT_MAX_FOLLOWERS,
+    ).exists()
+
+
+def fan_out_post(post):
+    """Разложить новый пост по лентам подписчиков автора."""
+    if is_celebrity(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers.iterator()
+        ),
+        batch_size=500,
+    )
+    # Ленты подрезаются при записи: подписчик может годами
+    # не открывать /follow/, а записи копятся от каждого поста
+    trim_timelines(followers.iterator())
+
+
+def _recent_posts(author_id):
+    return list(
+        Post.objects.filter(author_id=author_id)
+        .order_by('-pub_date', '-id')
+        .values_list('pk', 'pub_date')[:settings.POSTS_TIMELINE_SIZE]
+    )
+
+
+def _add_to_timeline(user_id, posts):
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ),
+        ignore_conflicts=True,
+    )
+    trim_timeline(user_id)
+
+
+def backfill_timeline(user_id, author_id):
+    """Добавить в ленту последние посты автора, на которого подписались."""
+    if is_celebrity(author_id):
+        return
+    _add_to_timeline(user_id, _recent_posts(author_id))
+
+
+def fan_out_author(author_id):
+    """
+    Разложить последние посты автора по лентам всех подписчиков.
+
+    Нужно, когда автор опустился ниже порога fan-out on read: посты,
+    опубликованные, пока он был выше, в ленты не раскладывались.
+    """
+    if is_celebrity(author_id):
+        return
+    posts = _recent_posts(author_id)
+    followers = Follow.objects.filter(
+        author_id=author_id).values_list('user_id', flat=True)
+    for user_id in followers.iterator():
+        _add_to_timeline(user_id, posts)
+
+
+def drop_author_from_timeline(user_id, author_id):
+    """Убрать из ленты посты автора, от которого отписались."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id).delete()
+
+
+def trim_timelines(user_ids):
+    """
+    Оставить в лентах только POSTS_TIMELINE_SIZE последних записей.
+
+    Граница каждой ленты читается один раз по индексу
+    (user, -pub_date, -post), а DELETE удаляет только записи за ней.
+    """
+    size = settings.POSTS_TIMELINE_SIZE
+    for user_id in user_ids:
+        entries = TimelineEntry.objects.filter(user_id=user_id)
+        cutoff = list(
+            entries.order_by('-pub_date', '-post_id')
+            .values_list('pub_date', 'post_id')[size:size + 1]
+        )
+        if not cutoff:
+            continue
+        pub_date, post_id = cutoff[0]
+        entries.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, post_id__lte=post_id)
+        ).delete()
+
+
+def trim_timeline(user_id):
+    """Оставить в ленте только POSTS_TIMELINE_SIZE последних записей."""
+    trim_timelines([user_id])
+
+
+def _sort_key(post):
+    return post.pub_date, post.pk
+
+
+class FollowFeed:
+    """
+    Лента подписок пользователя.
+
+    Посты обычных авторов читаются из TimelineEntry одним проходом
+    по индексу, посты авторов с огромным числом подписчиков
+    (fan-out on read) подмешиваются при чтении. Вся лента, как и
+    TimelineEntry, ограничена POSTS_TIMELINE_SIZE постами.
+    Поддерживает count() и срезы, поэтому отдаётся Paginator как есть.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def celebrity_ids(self):
+        return list(FollowerCounter.objects.filter(
+            author__following__user=self.user,
+            followers_count__gt=settings.POSTS_FANOUT_MAX_FOLLOWERS,
+        ).values_list('author_id', flat=True))
+
+    def _entries(self):
+        return (
+            TimelineEntry.objects.filter(user=self.user)
+            .order_by('-pub_date', '-post_id')
+        )
+
+    def count(self):
+        size = settings.POSTS_TIMELINE_SIZE
+        count = self._entries()[:size].count()
+        if self.celebrity_ids:
+            count += sum(PostCounter.objects.filter(
+                author_id__in=self.celebrity_ids,
+            ).values_list('posts_count', flat=True))
+        return min(count, size)
+
+    def _timeline_posts(self, start, stop):
+        entries = self._entries().select_related(
+            *(f'post__{field}' for field in FEED_RELATED)
+        ).defer('post__text', 'post__text_html')
+        return [entry.post for entry in entries[start:stop]]
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start = item.start or 0
+        stop = min(item.stop, settings.POSTS_TIMELINE_SIZE)
+        if not self.celebrity_ids:
+            return self._timeline_posts(start, stop) if start < stop else []
+
+        if start >= stop:
+            return []
+        # Каждый источник отдаёт не больше stop постов, дальше слияние
+        # в памяти
+        pulled = list(
+            Post.objects.filter(author_id__in=self.celebrity_ids)
+            .select_related(*FEED_RELATED)
+            .for_list()
+            .order_by('-pub_date', '-id')[:stop]
+        )
+        merged = merge(
+            self._timeline_posts(0, stop), pulled, key=_sort_key, reverse=True)
+        seen = set()
+        unique = (
+            post for post in merged
+            if not (post.pk in seen or seen.add(post.pk))
+        )
+        return list(islice(unique, start, stop))
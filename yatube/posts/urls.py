@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 
 # Эта строчка обязательна.
@@ -15,6 +15,54 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
     # Профайл пользователя
     path('profile/<str:username>/', views.profile, name='profile'),
+    # RSS и Atom лент
+    path('feed/', feeds.PostsFeed(), name='feed'),
+    path('feed/atom/', feeds.PostsAtomFeed(), name='feed_atom'),
+    path(
+        'group/<slug:slug>/feed/',
+        feeds.GroupPostsFeed(),
+        name='group_feed',
+    ),
+    path(
+        'group/<slug:slug>/feed/atom/',
+        feeds.GroupPostsAtomFeed(),
+        name='group_feed_atom',
+    ),
+    path(
+        'profile/<str:username>/feed/',
+        feeds.AuthorPostsFeed(),
+        name='profile_feed',
+    ),
+    path(
+        'profile/<str:username>/feed/atom/',
+        feeds.AuthorPostsAtomFeed(),
+        name='profile_feed_atom',
+    ),
+    # Строки лент для бесконечной прокрутки
+    path('rows/', views.index_rows, name='index_rows'),
+    path('group/<slug:slug>/rows/', views.group_rows, name='group_rows'),
+    path(
+        'profile/<str:username>/rows/',
+        views.profile_rows,
+        name='profile_rows',
+    ),
+    # Подписка на автора и отписка
+    path(
+        'profile/<str:username>/follow/',
+        views.profile_follow,
+        name='profile_follow',
+    ),
+    path(
+        'profile/<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow',
+    ),
+    # Лента подписок
+    path('follow/', views.follow_index, name='follow_index'),
+    # Поиск по постам
+    path('search/', views.search, name='search'),
+    # Выгрузка постов для персонала
+    path('export/', views.export_posts, name='export_posts'),
     # Просмотр поста
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     # Создание поста
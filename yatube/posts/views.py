@@ -1,15 +1,33 @@
 from django.core.paginator import Paginator
 from django.contrib.auth.models import User
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import urlencode
 
+from core.replicas import replica_reads
 
-from .models import Post, Group
+
+from .models import Follow, Post, Group, PostCounter
+from .conditional import (
+    group_condition, index_condition, post_condition, profile_condition,
+)
+from .export import FORMATS, export_lines
 from .forms import PostForm
+from .lookups import groups, users
+from .page_cache import anonymous_page_cache
+from .paginators import CursorPaginator, paginate
+from .search import PostSearch
+from .timeline import FollowFeed
 
 POST_QUANTITY = 10
 
 
+@replica_reads
+@index_condition
+@anonymous_page_cache
 def index(request):
     """Главная страница с постами."""
     # использовал django-querycount из статьи
@@ -32,58 +50,156 @@ def index(request):
     # Если я включаю отображение постов методе index
     # к трём запросам добавляется 11 запросов
     # Не знаю какие выводы из этого делать xD мыслать зашла в тупик
-    posts = Post.objects.select_related('author').select_related('group').all()
-    paginator = Paginator(posts, POST_QUANTITY)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = Post.objects.select_related(
+        'author__post_counter', 'group'
+    ).for_list()
+    page_obj = paginate(request, posts, POST_QUANTITY, 'index')
 
     context = {
         'page_obj': page_obj,
+        'rows_url': reverse('posts:index_rows'),
     }
 
     return render(request, 'posts/index.html', context)
 
 
+@replica_reads
+@group_condition
+@anonymous_page_cache
 def group_posts(request, slug):
     """Страница группы с постами."""
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, POST_QUANTITY)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = groups.get_or_404(slug)
+    posts = group.posts.select_related('author__post_counter').for_list()
+    page_obj = paginate(request, posts, POST_QUANTITY, f'group:{group.pk}')
 
     context = {
         'group': group,
         'page_obj': page_obj,
+        'rows_url': reverse('posts:group_rows', kwargs={'slug': slug}),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@replica_reads
+@profile_condition
 def profile(request, username):
     """Страница с постами автора."""
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    paginator = Paginator(posts, POST_QUANTITY)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    author = users.get_or_404(username)
+    # Счётчик автора приезжает вместе с постами страницы
+    posts = Post.objects.filter(author=author).select_related(
+        'author__post_counter', 'group'
+    ).for_list()
+    page_obj = paginate(
+        request, posts, POST_QUANTITY, f'author:{author.pk}'
+    )
+    posts_count = next(
+        (PostCounter.for_author(post.author) for post in page_obj),
+        None,
+    )
+    if posts_count is None:
+        posts_count = PostCounter.for_author(author)
+
+    following = (
+        request.user.is_authenticated
+        and request.user != author
+        and Follow.objects.filter(user=request.user, author=author).exists()
+    )
 
     context = {
         'author': author,
         'page_obj': page_obj,
-        'posts_count': author.posts.count(),
+        'posts_count': posts_count,
+        'following': following,
+        'rows_url': reverse(
+            'posts:profile_rows', kwargs={'username': username}
+        ),
     }
 
     return render(request, 'posts/profile.html', context)
 
 
+def feed_rows(request, posts, rows_url):
+    """
+    Строки ленты после курсора ?after= без шапки и подвала.
+
+    Отдаются как HTML-фрагмент для бесконечной прокрутки: следующий
+    курсор лежит в метке data-next-rows и в заголовке Link.
+    """
+    page_obj = CursorPaginator(
+        posts, POST_QUANTITY, after=request.GET.get('after')
+    ).page()
+    next_url = ''
+    if page_obj.has_next():
+        next_url = f'{rows_url}?after={page_obj.next_cursor}'
+    # render_to_string без запроса не запускает контекст-процессоры
+    response = HttpResponse(render_to_string(
+        'includes/post_rows.html',
+        {'page_obj': page_obj, 'next_url': next_url},
+    ))
+    if next_url:
+        response['Link'] = f'<{next_url}>; rel="next"'
+    return response
+
+
+@replica_reads
+def index_rows(request):
+    """Следующие строки главной ленты."""
+    posts = Post.objects.select_related(
+        'author__post_counter', 'group'
+    ).for_list()
+    return feed_rows(request, posts, reverse('posts:index_rows'))
+
+
+@replica_reads
+def group_rows(request, slug):
+    """Следующие строки ленты группы."""
+    group = groups.get_or_404(slug)
+    posts = group.posts.select_related('author__post_counter').for_list()
+    return feed_rows(
+        request, posts, reverse('posts:group_rows', kwargs={'slug': slug})
+    )
+
+
+@replica_reads
+def profile_rows(request, username):
+    """Следующие строки ленты автора."""
+    author = users.get_or_404(username)
+    posts = Post.objects.filter(author=author).select_related(
+        'author__post_counter', 'group'
+    ).for_list()
+    return feed_rows(
+        request, posts,
+        reverse('posts:profile_rows', kwargs={'username': username}),
+    )
+
+
+def search(request):
+    """Поиск по тексту постов."""
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(PostSearch(query), POST_QUANTITY)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        # ссылки паджинатора сохраняют поисковый запрос
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@replica_reads
+@post_condition
 def post_detail(request, post_id):
     """Страница одного поста."""
-    post = get_object_or_404(Post, pk=post_id)
+    # Страница выводит готовый HTML текста, сам текст не нужен
+    post = get_object_or_404(
+        Post.objects.with_details().defer('text'), pk=post_id)
 
     context = {
         'post': post,
         'author': post.author,
-        'posts_count': post.author.posts.count(),
+        'posts_count': post.author_posts_count,
     }
 
     return render(request, 'posts/post_detail.html', context)
@@ -112,13 +228,13 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     """Отредактировать пост."""
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.with_details(), pk=post_id)
     form = PostForm(
         request.POST or None,
         instance=post,
     )
 
-    if not request.user == post.author:
+    if not request.user.pk == post.author_id:
         return redirect('posts:post_detail', post_id=post_id)
 
     if form.is_valid():
@@ -131,3 +247,51 @@ def post_edit(request, post_id):
         'is_edit': True,
     }
     return render(request, 'posts/post_create.html', context)
+
+
+@login_required
+def follow_index(request):
+    """Посты авторов, на которых подписан пользователь."""
+    paginator = Paginator(FollowFeed(request.user), POST_QUANTITY)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+def profile_follow(request, username):
+    """Подписаться на автора."""
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    """Отписаться от автора."""
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('posts:profile', username=username)
+
+
+@user_passes_test(lambda user: user.is_staff)
+def export_posts(request):
+    """Потоковая выгрузка постов для персонала."""
+    fmt = request.GET.get('format', 'jsonl')
+    if fmt not in FORMATS:
+        fmt = 'jsonl'
+    posts = Post.objects.all()
+    if request.GET.get('author'):
+        author = get_object_or_404(User, username=request.GET['author'])
+        posts = posts.filter(author=author)
+    if request.GET.get('group'):
+        group = get_object_or_404(Group, slug=request.GET['group'])
+        posts = posts.filter(group=group)
+    response = StreamingHttpResponse(
+        export_lines(posts, fmt), content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="posts.{fmt}"'
+    return response
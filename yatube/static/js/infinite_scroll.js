@@ -0,0 +1,54 @@
+// Бесконечная лента: когда метка [data-next-rows] показывается на экране,
+// подгружаем следующие строки постов без шапки, подвала и паджинатора.
+(function () {
+  if (!('IntersectionObserver' in window)) {
+    return;
+  }
+
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (entry.isIntersecting) {
+        load(entry.target);
+      }
+    });
+  }, {rootMargin: '600px'});
+
+  function watch(root) {
+    root.querySelectorAll('[data-next-rows]').forEach(function (marker) {
+      observer.observe(marker);
+    });
+  }
+
+  function load(marker) {
+    observer.unobserve(marker);
+    fetch(marker.dataset.nextRows, {credentials: 'same-origin'})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.text();
+      })
+      .then(function (html) {
+        var rows = document.createElement('div');
+        rows.innerHTML = html;
+        marker.replaceWith(rows);
+        watch(rows);
+      })
+      .catch(function () {
+        // Не вышло — остаётся обычный паджинатор
+        document.querySelectorAll('.pagination').forEach(function (nav) {
+          nav.hidden = false;
+        });
+      });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    if (document.querySelector('[data-next-rows]')) {
+      // Дальше листаем прокруткой, номера страниц не нужны
+      document.querySelectorAll('.pagination').forEach(function (nav) {
+        nav.hidden = true;
+      });
+      watch(document);
+    }
+  });
+})();
@@ -1,3 +1,41 @@
-# from django.contrib import admin
+from django.contrib import admin
+from django.contrib.auth import admin as auth_admin
+from django.contrib.auth import get_user_model
 
-# Register your models here.
+from posts.models import Post
+from posts.purges import disable_authors
+
+User = get_user_model()
+
+
+class UserAdmin(auth_admin.UserAdmin):
+    """
+    Удаление пользователя только отключает его.
+
+    Посты, подписки и лента удаляются пачками фоновой задачей, а за
+    ними и сам пользователь: каскад по Post.author загрузил бы все посты
+    в память и удалял их одной долгой транзакцией. Прямой вызов
+    User.delete() мимо админки этого не делает, см. posts/purges.py.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        # Страница подтверждения тоже собирала бы все посты
+        objs = list(objs)
+        posts = Post.objects.filter(author__in=objs).count()
+        return (
+            [str(obj) for obj in objs],
+            {'посты, удаляемые в фоне': posts},
+            set(),
+            [],
+        )
+
+    def delete_model(self, request, obj):
+        disable_authors([obj])
+
+    def delete_queryset(self, request, queryset):
+        disable_authors(queryset)
+
+
+# Модуль auth.admin уже зарегистрировал стандартный UserAdmin при импорте
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     # 'querycount.middleware.QueryCountMiddleware',
+    'core.metrics.MetricsMiddleware',
+    'core.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,7 +66,8 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to MetricsMiddleware
+        'BACKEND': 'core.metrics.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -91,9 +94,51 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    },
+    # Stand-in read replica for local runs; point it at a real replica
+    # and list it in POSTS_READ_REPLICAS to route reads there
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+    },
+}
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+# Cache shared by every process serving the site. The page, count,
+# fragment, feed and lookup caches are invalidated by bumping version
+# keys, so a per-process backend (LocMemCache, Django's default) would
+# keep each bump inside the process that made it. Files work for the
+# processes of one host; several hosts need memcached or redis here.
+# The posts.E001 check refuses LocMemCache with POSTS_LOOKUP_SHARED_CACHE
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    },
 }
 
+# Aliases that read-only views read from (empty keeps every read on default)
+
+POSTS_READ_REPLICAS = []
+
+# Seconds a client that wrote keeps reading from the primary
+
+POSTS_PRIMARY_STICKINESS = 10
+
+# SQLite tuning applied to every new connection (see core/sqlite.py):
+# 'default' keeps SQLite's defaults, 'production' enables WAL,
+# synchronous=NORMAL, a larger page cache, mmap and busy_timeout
+
+SQLITE_PROFILE = 'default'
+
+if SQLITE_PROFILE == 'production':
+    # Persistent connections: the pragmas run once per connection,
+    # not once per request
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -139,8 +184,94 @@ LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
 
-# Connecting the engine filebased.EmailBackend
+# Keyset (cursor) pagination of the feeds by (pub_date, id) instead of ?page=N
+
+POSTS_CURSOR_PAGINATION = False
+
+# Cached post counts of the feeds: seconds to keep them and an optional
+# row limit for COUNT(*) on very large tables (None means exact counts)
+
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 5
+
+POSTS_COUNT_APPROXIMATE_LIMIT = None
+
+# Seconds to keep the rendered rows of includes/article.html
+
+POSTS_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+# Whole-page cache of the first feed pages for anonymous readers
+
+POSTS_PAGE_CACHE_PAGES = 3
+
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Follow timeline: entries kept per user and the follower count above
+# which an author's posts are merged in on read instead of fanned out
+
+POSTS_TIMELINE_SIZE = 1000
+
+POSTS_FANOUT_MAX_FOLLOWERS = 10000
+
+# In-process LRU of groups by slug and users by username: entries per
+# process, and whether to share the rows through the cache between processes
+
+POSTS_LOOKUP_CACHE_SIZE = 1024
+
+POSTS_LOOKUP_SHARED_CACHE = True
+
+POSTS_LOOKUP_CACHE_TIMEOUT = 60 * 60
+
+# Seconds an in-process LRU entry is trusted before it is read again from
+# the shared cache, should a version bump have been lost with its cache key
+
+POSTS_LOOKUP_LOCAL_TIMEOUT = 60
+
+# Posts in the RSS and Atom feeds
+
+POSTS_FEED_SIZE = 20
+
+# Posts fetched per keyset query when exporting
+
+POSTS_EXPORT_CHUNK_SIZE = 2000
+
+# Rows counted at most for a filtered post list in the admin
+
+POSTS_ADMIN_COUNT_LIMIT = 10000
+
+# Posts moved or deleted per transaction by bulk moderation
+
+POSTS_MODERATION_CHUNK_SIZE = 1000
+
+# Seconds without progress after which a running author purge counts as
+# abandoned and another worker or purge_authors run may take it over
+
+POSTS_PURGE_LEASE_TIMEOUT = 60 * 10
+
+# Background job queue in the database (see core/jobs.py), run by
+# manage.py run_worker: concurrent jobs and pool kind ('thread' or
+# 'process'), seconds between polls of an empty queue, attempts with
+# exponential backoff between them, and seconds after which a job of a
+# dead worker is claimed again
+
+JOBS_CONCURRENCY = 4
+
+JOBS_POOL = 'thread'
+
+JOBS_POLL_INTERVAL = 1
+
+JOBS_MAX_ATTEMPTS = 5
+
+JOBS_RETRY_BACKOFF = 10
+
+JOBS_RETRY_BACKOFF_MAX = 60 * 60
+
+JOBS_LOCK_TIMEOUT = 60 * 10
+
+# Mail is queued as a job and sent by the worker through
+# QUEUED_EMAIL_BACKEND, the engine filebased.EmailBackend
+
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+QUEUED_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')